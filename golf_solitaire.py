@@ -1,11 +1,21 @@
-import copy
-import random
+# Worker processes import this module over and over, so it imports nothing at load time. typing is
+# only for type checkers (they treat a module's own TYPE_CHECKING like typing.TYPE_CHECKING), and
+# random is imported when a deck is first shuffled
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Iterable, Sequence
+    from golf_solitaire_dealdb import CorpusEntry
 
 # CONSTANTS
 CARD_FACES = ["H", "C", "S", "D"]
 CARD_VALUES = ["A", "2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K"]
 CARD_WIDTH = 5
 LINE_SEP = " "
+TABLEAU_COLUMNS = 7
+COLUMN_DEPTH = 5
+STOCK_SIZE = 15
+STOCK = TABLEAU_COLUMNS # Source index of the stockpile, tableau columns are 0-6
+SHUFFLE_VERSION = 1 # Of CardDeck.shuffle(seed), kept with archived seeds. Bump it if a seed deals other cards
 
 FACE_MAPPING = {
     "H": "♡",
@@ -14,89 +24,263 @@ FACE_MAPPING = {
     "D": "♢"
 }
 
-# Basic card class
+# Cards are numbered 0-51 in CardDeck order: face index * 13 + value index
+CARD_COUNT = len(CARD_FACES) * len(CARD_VALUES)
+
+def card_index(face: str, value: str) -> int:
+    return CARD_FACES.index(face) * len(CARD_VALUES) + CARD_VALUES.index(value)
+
+# Deal IDs number every order of the deck, 0 <= deal_id < DEAL_COUNT (52!). An ID is read as digits
+# of the factorial number system, the digit for position i (counted from 52 down to 1) picks the card
+# swapped into that position (Myrvold and Ruskey's unranking). That takes 52 steps, where unranking
+# by Lehmer code in lexicographic order takes 52 list removals
+def _factorial(n: int) -> int:
+    result = 1
+    for k in range(2, n + 1):
+        result *= k
+    return result
+
+DEAL_COUNT = _factorial(CARD_COUNT)
+
+def unrank_deal(deal_id: int) -> bytes:
+    """The card indices in CardDeck order of a deal ID"""
+    if not 0 <= deal_id < DEAL_COUNT:
+        raise ValueError(f"A deal ID is from 0 to 52! - 1, not {deal_id}")
+    order = bytearray(range(CARD_COUNT))
+    for size in range(CARD_COUNT, 0, -1):
+        deal_id, digit = divmod(deal_id, size)
+        order[size - 1], order[digit] = order[digit], order[size - 1]
+    return bytes(order)
+
+def rank_deal(order: Sequence[int]) -> int:
+    """The deal ID of card indices in CardDeck order, the inverse of unrank_deal"""
+    cards = bytearray(order)
+    if sorted(cards) != list(range(CARD_COUNT)):
+        raise ValueError("A deck order must hold every card index exactly once")
+    positions = bytearray(CARD_COUNT)
+    for position, index in enumerate(cards):
+        positions[index] = position
+    digits = []
+    # Undo the swaps of unrank_deal from the last position back, the card in a position is its digit
+    for size in range(CARD_COUNT, 0, -1):
+        card = cards[size - 1]
+        other = positions[size - 1]
+        cards[size - 1], cards[other] = cards[other], cards[size - 1]
+        positions[card], positions[size - 1] = positions[size - 1], positions[card]
+        digits.append(card)
+    deal_id = 0
+    for size, digit in zip(range(1, CARD_COUNT + 1), reversed(digits)):
+        deal_id = deal_id * size + digit
+    return deal_id
+
+def _ranks_adjacent(a: int, b: int) -> bool:
+    distance = abs(a % len(CARD_VALUES) - b % len(CARD_VALUES))
+    return distance == 1 or distance == len(CARD_VALUES) - 1
+
+# Precomputed rank adjacency, ADJACENT[a][b] is 1 if card b can go on top of card a (A and K wrap)
+ADJACENT: tuple[bytes, ...] = tuple(
+    bytes(_ranks_adjacent(a, b) for b in range(CARD_COUNT)) for a in range(CARD_COUNT)
+)
+
+# Zobrist keys: one per card per slot plus one per card for being the waste top.
+# Slots are tableau positions (column * COLUMN_DEPTH + depth), stock positions, and the waste
+STOCK_SLOT = TABLEAU_COLUMNS * COLUMN_DEPTH
+WASTE_SLOT = STOCK_SLOT + STOCK_SIZE
+SLOT_COUNT = WASTE_SLOT + 1
+
+def _zobrist_keys(count: int, seed: int = 0x5EED601F) -> tuple[int, ...]:
+    # SplitMix64, so the keys are the same on every platform and Python version
+    keys = []
+    state = seed
+    for _ in range(count):
+        state = (state + 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        z = state
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+        keys.append(z ^ (z >> 31))
+    return tuple(keys)
+
+# Generated when the first position is hashed, code that only uses the constants never needs them
+ZOBRIST_SLOT: tuple[int, ...] = () # Indexed by card * SLOT_COUNT + slot
+ZOBRIST_TOP: tuple[int, ...] = () # Indexed by card
+
+def _load_zobrist_keys():
+    global ZOBRIST_SLOT, ZOBRIST_TOP
+    ZOBRIST_SLOT = _zobrist_keys(CARD_COUNT * SLOT_COUNT)
+    ZOBRIST_TOP = _zobrist_keys(CARD_COUNT, seed=0x70B5EED)
+
+# Basic card class. Cards are immutable and exist once: CARDS holds the 52 canonical cards and
+# Card(face, value) returns one of them, so every game shares them and copies are the card itself
 class Card:
-    def __init__(self, face, value, hidden = False):
-        self.face: str = face
-        self.value: str = value
-        self.hidden: bool = hidden
+    __slots__ = ("face", "value", "index")
+
+    def __new__(cls, face, value):
+        return CARDS[card_index(face, value)]
+
+    @classmethod
+    def _create(cls, index: int) -> Card:
+        card = object.__new__(cls)
+        # The face and value strings are the shared ones from CARD_FACES and CARD_VALUES
+        object.__setattr__(card, "face", CARD_FACES[index // len(CARD_VALUES)])
+        object.__setattr__(card, "value", CARD_VALUES[index % len(CARD_VALUES)])
+        object.__setattr__(card, "index", index)
+        return card
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Cards are immutable")
+
+    def __reduce__(self):
+        return (Card, (self.face, self.value))
 
     def __repr__(self):
-        return f"{{{self.face}{self.value} hidden: {self.hidden}}}"
+        return f"{{{self.face}{self.value}}}"
     
     def __str__(self):
-        return "[**]" if self.hidden else f"[{self.face}{self.value}]"
+        return f"[{self.face}{self.value}]"
     
     def can_place_on_top(self, other: Card) -> bool:
-        return abs(CARD_VALUES.index(other.value) - CARD_VALUES.index(self.value)) == 1 or (other.value == "K" and self.value == "A") or (other.value == "A" and self.value == "K")
+        return ADJACENT[self.index][other.index] == 1
 
-# Class for a pile of cards
+CARDS: tuple[Card, ...] = tuple(Card._create(index) for index in range(CARD_COUNT))
+
+# Class for a pile of cards, stored bottom to top as card indices. A face-down pile hides all its cards
 class Pile:
-    def __init__(self, cards, faceDown=False):
-        self.cards: list[Card] = cards
-        if faceDown:
-            for card in self.cards:
-                card.hidden = True
+    __slots__ = ("indices", "hidden", "version")
+
+    def __init__(self, cards: Iterable[Card] = (), faceDown=False):
+        self.indices: bytearray = bytearray(card.index for card in cards)
+        self.hidden: bool = faceDown
+        self.version: int = 0 # Bumped on every change, lets views cache what they drew
 
     def __repr__(self):
-        return f"{",".join([repr(card) for card in self.cards])}"
+        return ",".join([f"{{{CARDS[index].face}{CARDS[index].value} hidden: {self.hidden}}}" for index in self.indices])
+
+    def __len__(self):
+        return len(self.indices)
+
+    # The cards bottom to top, as a new list
+    @property
+    def cards(self) -> list[Card]:
+        return [CARDS[index] for index in self.indices]
 
     def draw_card(self) -> Card|None:
-        if len(self.cards) > 0:
-            card = self.cards.pop()
-            card.hidden = False
-            return card
+        if len(self.indices) > 0:
+            self.version += 1
+            return CARDS[self.indices.pop()]
         else:
             return None
     
     def peek_card(self) -> Card|None:
-        if len(self.cards) > 0:
-            return self.cards[-1]
+        if len(self.indices) > 0:
+            return CARDS[self.indices[-1]]
         else: 
             return None
     
-    def place_card(self, card):
-        self.cards.append(card)
+    def place_card(self, card: Card):
+        self.indices.append(card.index)
+        self.version += 1
+
+    # Replaces all cards of the pile
+    def set_cards(self, indices: Iterable[int]):
+        self.indices = bytearray(indices)
+        self.version += 1
+
+# A move onto the wastepile: the top card of a tableau column (0-6) or of the stockpile (STOCK)
+# A tuple subclass instead of a NamedTuple, which would need typing
+class Move(tuple):
+    __slots__ = ()
+
+    def __new__(cls, source: int, card: Card):
+        return tuple.__new__(cls, (source, card))
 
-# Class to handle undoing of actions
+    def __getnewargs__(self):
+        return tuple(self)
+
+    @property
+    def source(self) -> int:
+        return self[0]
+
+    @property
+    def card(self) -> Card:
+        return self[1]
+
+    def __repr__(self):
+        return "S" if self.source == STOCK else f"D{self.source + 1}"
+
+# One journal entry: the pile the card came from (column 0-6 or STOCK), the card, and the move counter before the move
+JournalEntry = tuple[int, Card, int]
+
+# Class to handle undoing and redoing of actions, as a journal of moves onto the wastepile
 class Redo:
-    def __init__(self):
-        self.state: list[GolfGame] = []
+    def __init__(self, max_depth: int|None = None):
+        self.max_depth = max_depth
+        self.done: list[JournalEntry] = []
+        self.undone: list[JournalEntry] = []
 
-    def undo(self):
-        if len(self.state) > 1:
-            self.state.pop()
-            return self.state[-1]
+    def __len__(self):
+        return len(self.done)
+
+    def undo(self) -> JournalEntry|None:
+        if len(self.done) > 0:
+            entry = self.done.pop()
+            self.undone.append(entry)
+            return entry
         return None
-    
-    def add(self, state):
-        state_snapshot = state.__dict__.copy()
 
-        if 'movestack' in state_snapshot:
-            del state_snapshot['movestack']
-        
-        for key in ['tableau', 'stockpile', 'wastepile']:
-            if key in state_snapshot:
-                state_snapshot[key] = copy.deepcopy(state_snapshot[key])
+    def redo(self) -> JournalEntry|None:
+        if len(self.undone) > 0:
+            entry = self.undone.pop()
+            self.done.append(entry)
+            return entry
+        return None
 
-        self.state.append(state_snapshot)
-        print(f"DEBUG: State saved. Stack size: {len(self.state)}")
+    def add(self, source: int, card: Card, moves: int):
+        self.done.append((source, card, moves))
+        self.undone.clear()
+        # Trim in batches so bounded histories stay O(1) per move
+        if self.max_depth is not None and len(self.done) >= 2 * self.max_depth:
+            del self.done[:len(self.done) - self.max_depth]
 
 # Class to represent the state of a game of Golf Solitaire
 class GolfGame:
-    def __init__(self):
+    def __init__(self, seed: int|None = None, max_history: int|None = None, deck: Sequence[int]|None = None):
         self.selected = 1
         cards = CardDeck()
-        cards.shuffle()
+        if deck is None:
+            cards.shuffle(seed)
+        else:
+            cards.arrange(deck)
+        # How the game was dealt: the seed if there was one, and the card order as card indices
+        self.seed: int|None = seed if deck is None else None
+        self.deal: bytes = bytes(card.index for card in cards.cards)
         self.tableau: list[Pile] = []
-        for i in range(7):
-            col = Pile(cards.draw_card(5))
+        for i in range(TABLEAU_COLUMNS):
+            col = Pile(cards.draw_card(COLUMN_DEPTH))
             self.tableau.append(col)
-        self.stockpile: Pile = Pile(cards.draw_card(15), faceDown=True)
+        self.stockpile: Pile = Pile(cards.draw_card(STOCK_SIZE), faceDown=True)
         self.wastepile: Pile = Pile(cards.draw_card(1))
-        self.movestack: Redo = Redo()
+        self.movestack: Redo = Redo(max_history)
         self.moves: int = 0
-        self.movestack.add(self)
+        self._position_hash: int = self.compute_position_hash()
+        # Move for the top card of every column, only rebuilt for the column a move touches
+        self._column_moves: list[Move|None] = [self._column_move(col) for col in range(TABLEAU_COLUMNS)]
+        self._legal_moves: tuple[Move, ...]|None = None
+
+    @classmethod
+    def from_corpus_entry(cls, entry: CorpusEntry, max_history: int|None = None) -> GolfGame:
+        """Deal a game of the deal database from its stored card order, without shuffling"""
+        game = cls(max_history=max_history, deck=entry.deal)
+        game.seed = entry.seed
+        return game
+
+    @classmethod
+    def from_deal_id(cls, deal_id: int, max_history: int|None = None) -> GolfGame:
+        return cls(max_history=max_history, deck=unrank_deal(deal_id))
+
+    @property
+    def deal_id(self) -> int:
+        """Number of this deal, equal deals have equal IDs however they were dealt"""
+        return rank_deal(self.deal)
     
     def __repr__(self):
         return f"Tableau:\n{"\n".join([repr(tab) for tab in self.tableau])}\n\nStock Pile\n{self.stockpile}\nWaste Pile\n{self.wastepile}"
@@ -104,20 +288,62 @@ class GolfGame:
     def draw_from_wastepile(self):
         newCard = self.stockpile.draw_card()
         if (newCard is not None):
-            self.moves += 1
-            self.wastepile.place_card(newCard)
-            self.movestack.add(self)
+            self.place_on_wastepile(STOCK, newCard)
             return "Drew a card from the stockpile"
         return "No more cards on the stockpile"
-    
+
+    def place_on_wastepile(self, source: int, card: Card):
+        self.movestack.add(source, card, self.moves)
+        self.moves += 1
+        self._hash_move(source, card, self.wastepile.peek_card(), card)
+        self.wastepile.place_card(card)
+        self._moves_changed(source)
+
+    # Legal moves of the current position, cached until the next move, undo or redo. A tuple, so
+    # callers can't change the cached moves
+    def legal_moves(self) -> tuple[Move, ...]:
+        if self._legal_moves is None:
+            topCard = self.wastepile.peek_card()
+            moves = []
+            if topCard is not None:
+                fits = ADJACENT[topCard.index]
+                moves = [move for move in self._column_moves if move is not None and fits[move.card.index]]
+            stockTop = self.stockpile.peek_card()
+            if stockTop is not None:
+                moves.append(Move(STOCK, stockTop))
+            self._legal_moves = tuple(moves)
+        return self._legal_moves
+
+    # Plays a move returned by legal_moves() for this position
+    def apply(self, move: Move):
+        if move not in self.legal_moves():
+            raise ValueError(f"Move {move!r} is not legal in this position")
+        if move.source == STOCK:
+            self.stockpile.draw_card()
+        else:
+            self.tableau[move.source].draw_card()
+        self.place_on_wastepile(move.source, move.card)
+
+    def _column_move(self, col: int) -> Move|None:
+        card = self.tableau[col].peek_card()
+        return None if card is None else Move(col, card)
+
+    # Called after a card moved between the wastepile and source
+    def _moves_changed(self, source: int):
+        self._legal_moves = None
+        if source != STOCK:
+            self._column_moves[source] = self._column_move(source)
+
+    # Moves a card that is on top of a tableau pile onto the wastepile
     def try_put_on_wastepile(self, card: Card) -> bool:
         topCard = self.wastepile.peek_card()
         if topCard is not None:
             if topCard.can_place_on_top(card):
-                self.moves += 1
-                self.wastepile.place_card(card=card)
-                self.movestack.add(self)
-                return True
+                for row, col in enumerate(self.tableau):
+                    if col.peek_card() is card:
+                        col.draw_card()
+                        self.place_on_wastepile(row, card)
+                        return True
         return False
     
     def try_draw_card(self, row):
@@ -126,34 +352,103 @@ class GolfGame:
         if (newCard is not None):
             if (topCard is not None):
                 if(topCard.can_place_on_top(newCard)):
-                    self.moves += 1
                     self.tableau[row].draw_card()
-                    self.wastepile.place_card(newCard)
-                    self.movestack.add(self)
+                    self.place_on_wastepile(row, newCard)
                     return "Placed card on wastepile"
                 return f"Move not allowed! {topCard.value} vs. {newCard.value}"
             return "No cards on wastepile"
         return "No cards on selected pile"
 
     def undo(self):
-        self.moves += 1
-        previous_snapshot = self.movestack.undo()
-        
-        if previous_snapshot is None:
+        entry = self.movestack.undo()
+
+        if entry is None:
             return "No previous moves to undo!"
-           
-        self.__dict__.update(previous_snapshot) # type: ignore
+
+        source, card, moves = entry
+        self.wastepile.draw_card()
+        self._hash_move(source, card, card, self.wastepile.peek_card())
+        if source == STOCK:
+            self.stockpile.place_card(card)
+        else:
+            self.tableau[source].place_card(card)
+        self.moves = moves
+        self._moves_changed(source)
         return "Undone last move"
+
+    def redo(self):
+        entry = self.movestack.redo()
+
+        if entry is None:
+            return "No moves to redo!"
+
+        source, card, moves = entry
+        if source == STOCK:
+            self.stockpile.draw_card()
+        else:
+            self.tableau[source].draw_card()
+        self._hash_move(source, card, self.wastepile.peek_card(), card)
+        self.wastepile.place_card(card)
+        self.moves = moves + 1
+        self._moves_changed(source)
+        return "Redone last move"
+
+    # Rebuilds everything derived from the piles, after they were rearranged directly
+    def refresh(self):
+        for pile in (*self.tableau, self.stockpile, self.wastepile):
+            pile.version += 1
+        self._position_hash = self.compute_position_hash()
+        self._column_moves = [self._column_move(col) for col in range(TABLEAU_COLUMNS)]
+        self._legal_moves = None
+
+    # 64-bit Zobrist hash of the position, kept up to date by every move, undo and redo
+    @property
+    def position_hash(self) -> int:
+        return self._position_hash
+
+    def compute_position_hash(self) -> int:
+        if not ZOBRIST_TOP:
+            _load_zobrist_keys()
+        position_hash = 0
+        for col, pile in enumerate(self.tableau):
+            for depth, index in enumerate(pile.indices):
+                position_hash ^= ZOBRIST_SLOT[index * SLOT_COUNT + col * COLUMN_DEPTH + depth]
+        for depth, index in enumerate(self.stockpile.indices):
+            position_hash ^= ZOBRIST_SLOT[index * SLOT_COUNT + STOCK_SLOT + depth]
+        for index in self.wastepile.indices:
+            position_hash ^= ZOBRIST_SLOT[index * SLOT_COUNT + WASTE_SLOT]
+        topCard = self.wastepile.peek_card()
+        if topCard is not None:
+            position_hash ^= ZOBRIST_TOP[topCard.index]
+        return position_hash
+
+    # Updates the hash for a card moving between the top of its source pile and the wastepile,
+    # called while the source pile does not hold the card
+    def _hash_move(self, source: int, card: Card, oldTop: Card|None, newTop: Card|None):
+        if source == STOCK:
+            slot = STOCK_SLOT + len(self.stockpile)
+        else:
+            slot = source * COLUMN_DEPTH + len(self.tableau[source])
+        base = card.index * SLOT_COUNT
+        position_hash = self._position_hash ^ ZOBRIST_SLOT[base + slot] ^ ZOBRIST_SLOT[base + WASTE_SLOT]
+        if oldTop is not None:
+            position_hash ^= ZOBRIST_TOP[oldTop.index]
+        if newTop is not None:
+            position_hash ^= ZOBRIST_TOP[newTop.index]
+        self._position_hash = position_hash
     
     def draw_tableau(self) -> str:
         output = []
-        max_len = max(len(col.cards) for col in self.tableau)
+        # Card indices and heights read once, Pile.cards builds a new list on every access
+        columns = [col.indices for col in self.tableau]
+        heights = [len(indices) for indices in columns]
+        max_len = max(heights)
         for i in range(max_len): # Exclude the bottom-most card
         
             # Line 1 (Top Border for the stacked card): +---+, +---+, ...
             top_line = ""
-            for col in self.tableau:
-                if i < len(col.cards)+1 and len(col.cards) > 0:
+            for height in heights:
+                if i < height+1 and height > 0:
                     # Card is present at this depth
                     top_line += "+---+" + LINE_SEP
                 else:
@@ -162,9 +457,9 @@ class GolfGame:
         
             # Line 2 (Card Face for the stacked card): |A  |, |Q  |, ...
             face_line = ""
-            for col in self.tableau:
-                if i < len(col.cards):
-                    card = col.cards[i]
+            for indices in columns:
+                if i < len(indices):
+                    card = CARDS[indices[i]]
                     face = (card.value + FACE_MAPPING[card.face]).ljust(CARD_WIDTH - 2)
                     face_line += f"|{face}|" + LINE_SEP
                 else:
@@ -176,8 +471,8 @@ class GolfGame:
 
         # --- Draw Bottom-most Card (The fully visible top card) ---
         bottom_line = ""
-        for col in self.tableau:
-            if max_len > 0 and max_len - 1 < len(col.cards):
+        for height in heights:
+            if max_len > 0 and max_len - 1 < height:
                 # Only draw the bottom border if a card exists at this final depth
                 bottom_line += "+---+" + LINE_SEP
             else:
@@ -210,7 +505,7 @@ class GolfGame:
         # Draw title
 
         # Draw Menu
-        menu_bar_pt1 = f"Score:{self.moves}  Stock:{len(self.stockpile.cards)}\n"
+        menu_bar_pt1 = f"Score:{self.moves}  Stock:{len(self.stockpile)}\n"
         menu_bar_pt2 = "-"*7*6+"\n"
         menu_bar_pt3 = []
         for i in range(7):
@@ -226,30 +521,36 @@ class GolfGame:
         return menu_bar_pt1+menu_bar_pt2+menu_bar_pt3+tableau+"\n\n"+bottom_part1+bottom_part2
     
     def check_game_state(self) -> str:
-        if (len(self.stockpile.cards) == 0 and len(self.wastepile.cards) != 52):
-            allInvalid = True
-            for col in self.tableau:
-                top = col.peek_card()
-                if (top):
-                    if (top.can_place_on_top(self.wastepile.peek_card())): # type: ignore
-                        allInvalid = False
-            return "lose" if allInvalid else "running"
-        for col in self.tableau:
-            val = col.peek_card()
-            if not val is None:
-                return "running"
-        return "win"
+        if all(col.peek_card() is None for col in self.tableau):
+            return "win"
+        if (len(self.stockpile) == 0):
+            return "lose" if not self.legal_moves() else "running"
+        return "running"
 
 # Class to represent one card deck
 class CardDeck:
     def __init__(self):
-        self.cards = []
-        for face in CARD_FACES:
-            for value in CARD_VALUES:
-                self.cards.append(Card(face, value))
+        self.cards: list[Card] = list(CARDS)
+
+    @classmethod
+    def from_deal_id(cls, deal_id: int) -> CardDeck:
+        deck = cls()
+        deck.arrange(unrank_deal(deal_id))
+        return deck
     
-    def shuffle(self):
-        random.shuffle(self.cards)
+    # The same seed always gives the same card order
+    def shuffle(self, seed: int|None = None):
+        import random
+        if seed is None:
+            random.shuffle(self.cards)
+        else:
+            random.Random(seed).shuffle(self.cards)
+
+    # Puts the cards in the order of the given card indices, the last one is dealt first
+    def arrange(self, order: Sequence[int]):
+        if sorted(order) != list(range(CARD_COUNT)):
+            raise ValueError("A deck order must hold every card index exactly once")
+        self.cards = [CARDS[index] for index in order]
 
     def draw_card(self, number=1):
         drawn = []
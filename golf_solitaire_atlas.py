@@ -0,0 +1,95 @@
+import argparse
+import os
+from collections import OrderedDict
+import pygame
+from golf_solitaire import CARD_COUNT, CARD_FACES, CARD_VALUES
+
+# --- CONSTANTS ---
+SPRITE_DIR = "Card_Deck_Sprites"
+ATLAS_PATH = os.path.join(SPRITE_DIR, "atlas.png")
+# Cards sit in a grid in CardDeck order, one row per face, with the card back alone on the last row
+ATLAS_COLUMNS = len(CARD_VALUES)
+ATLAS_ROWS = len(CARD_FACES) + 1
+BACK_INDEX = CARD_COUNT
+SCALED_CACHE_SIZE = 4
+
+def sprite_name(index: int) -> str:
+    if index == BACK_INDEX:
+        return "card_back.png"
+    return f"card_{CARD_FACES[index // len(CARD_VALUES)]}{CARD_VALUES[index % len(CARD_VALUES)]}.png"
+
+def build_atlas(sprite_dir: str = SPRITE_DIR) -> pygame.Surface:
+    """Pack the card PNGs into one surface. Cells take the size of the first sprite"""
+    sprites = []
+    for index in range(CARD_COUNT + 1):
+        path = os.path.join(sprite_dir, sprite_name(index))
+        try:
+            sprites.append(pygame.image.load(path))
+        except (pygame.error, FileNotFoundError) as e:
+            print(f"Error loading image for {path}: {e}")
+            sprites.append(None)
+    size = next((sprite.get_size() for sprite in sprites if sprite is not None), (1, 1))
+    atlas = pygame.Surface((size[0] * ATLAS_COLUMNS, size[1] * ATLAS_ROWS), pygame.SRCALPHA)
+    for index, sprite in enumerate(sprites):
+        cell = cell_rect(index, size)
+        if sprite is None:
+            # A red rectangle as a placeholder if the image fails to load
+            atlas.fill((255, 0, 0), cell)
+        else:
+            atlas.blit(pygame.transform.scale(sprite, size), cell)
+    return atlas
+
+def cell_rect(index: int, size: tuple[int, int]) -> pygame.Rect:
+    width, height = size
+    return pygame.Rect(index % ATLAS_COLUMNS * width, index // ATLAS_COLUMNS * height, width, height)
+
+# Card images cut from one atlas surface. The atlas is decoded once; scaled copies are kept per card
+# size, least recently used first out, so changing the card size does not go back to disk.
+class CardAtlas:
+    def __init__(self, atlas: pygame.Surface, cache_size: int = SCALED_CACHE_SIZE):
+        self.atlas = atlas
+        self.cell_size = (atlas.get_width() // ATLAS_COLUMNS, atlas.get_height() // ATLAS_ROWS)
+        self.cache_size = cache_size
+        self.scaled: OrderedDict[tuple[int, int], list[pygame.Surface]] = OrderedDict()
+
+    @classmethod
+    def load(cls, path: str = ATLAS_PATH, sprite_dir: str = SPRITE_DIR) -> CardAtlas:
+        """Decode the atlas file once, packing the loose PNGs in memory if it has not been built"""
+        if os.path.exists(path):
+            atlas = pygame.image.load(path)
+        else:
+            atlas = build_atlas(sprite_dir)
+        if pygame.display.get_surface() is not None:
+            atlas = atlas.convert_alpha()
+        return cls(atlas)
+
+    def images(self, size: tuple[int, int]) -> list[pygame.Surface]:
+        """Images of all cards at the given size, indexed by card index with the back at BACK_INDEX"""
+        images = self.scaled.get(size)
+        if images is not None:
+            self.scaled.move_to_end(size)
+            return images
+        # Cells scale to whole pixels, so the scaled atlas keeps the same grid
+        atlas = pygame.transform.scale(self.atlas, (size[0] * ATLAS_COLUMNS, size[1] * ATLAS_ROWS))
+        images = [atlas.subsurface(cell_rect(index, size)) for index in range(CARD_COUNT + 1)]
+        self.scaled[size] = images
+        if len(self.scaled) > self.cache_size:
+            self.scaled.popitem(last=False)
+        return images
+
+    def image(self, index: int, size: tuple[int, int]) -> pygame.Surface:
+        return self.images(size)[index]
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack the card sprites into one atlas image")
+    parser.add_argument("--sprites", default=SPRITE_DIR, help="directory with the card PNGs")
+    parser.add_argument("--out", default=ATLAS_PATH, help="atlas file to write")
+    args = parser.parse_args()
+
+    atlas = build_atlas(args.sprites)
+    pygame.image.save(atlas, args.out)
+    width, height = atlas.get_size()
+    print(f"Wrote {args.out}: {width}x{height}, {ATLAS_COLUMNS}x{ATLAS_ROWS} cells of {width // ATLAS_COLUMNS}x{height // ATLAS_ROWS}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+import argparse
+import random
+import time
+import numpy as np
+from golf_solitaire import ADJACENT, CARD_COUNT, CARD_VALUES, COLUMN_DEPTH, STOCK, STOCK_SIZE, TABLEAU_COLUMNS
+
+# CONSTANTS
+RUNNING, WIN, LOSE = 0, 1, 2
+EMPTY_RANK = len(CARD_VALUES) # Rank used for the top of an empty column, never adjacent to anything
+# Rank adjacency, taken from the card table so it follows Card.can_place_on_top (cards 0-12 are one face)
+RANK_ADJACENT = np.zeros((EMPTY_RANK + 1, EMPTY_RANK + 1), dtype=bool)
+RANK_ADJACENT[:EMPTY_RANK, :EMPTY_RANK] = [[ADJACENT[a][b] for b in range(EMPTY_RANK)] for a in range(EMPTY_RANK)]
+
+# --- SEEDED DEALS ---
+# random.Random(seed).shuffle, replayed for many seeds at once. CPython seeds its Mersenne Twister with
+# init_by_array and shuffles with _randbelow, which rejects getrandbits(k) results that are too large.
+# The first 227 outputs of a fresh generator only depend on words of the seeded state.
+
+MT_SIZE = 624
+MT_SHIFT = 397
+MT_USED = 192 # Outputs kept per seed, a shuffle of 52 cards takes about 80
+DEAL_CHUNK = 8192 # Seeds replayed at once, keeps the generator state small enough for the CPU cache
+
+def _mt_init_base() -> np.ndarray:
+    # init_genrand(19650218), the same for every seed
+    mt = [19650218]
+    for i in range(1, MT_SIZE):
+        mt.append((1812433253 * (mt[-1] ^ (mt[-1] >> 30)) + i) & 0xFFFFFFFF)
+    return np.array(mt, dtype=np.uint32)
+
+def _mt_outputs(seeds: np.ndarray) -> np.ndarray:
+    """First MT_USED outputs of random.Random(seed) for 32-bit seeds, as an N x MT_USED array"""
+    mt = np.repeat(_mt_init_base()[:, None], len(seeds), axis=1)
+    # init_by_array with a one word key, with in-place ufuncs since this runs 1247 times per chunk
+    mix = np.empty(len(seeds), dtype=np.uint32)
+    shift = np.uint32(30)
+    i = 1
+    for step in range(2 * MT_SIZE - 1):
+        prev = mt[i - 1]
+        word = mt[i]
+        np.right_shift(prev, shift, out=mix)
+        np.bitwise_xor(mix, prev, out=mix)
+        if step < MT_SIZE:
+            np.multiply(mix, np.uint32(1664525), out=mix)
+            np.bitwise_xor(word, mix, out=word)
+            np.add(word, seeds, out=word)
+        else:
+            np.multiply(mix, np.uint32(1566083941), out=mix)
+            np.bitwise_xor(word, mix, out=word)
+            np.subtract(word, np.uint32(i), out=word)
+        i += 1
+        if i >= MT_SIZE:
+            mt[0] = mt[MT_SIZE - 1]
+            i = 1
+    mt[0] = 0x80000000
+
+    # First twist, only the part that produces the outputs we keep. Its inputs are all untouched words
+    y = (mt[:MT_USED] & np.uint32(0x80000000)) | (mt[1:MT_USED + 1] & np.uint32(0x7FFFFFFF))
+    y = mt[MT_SHIFT:MT_SHIFT + MT_USED] ^ (y >> np.uint32(1)) ^ ((y & np.uint32(1)) * np.uint32(0x9908B0DF))
+
+    # Tempering
+    y ^= y >> np.uint32(11)
+    y ^= (y << np.uint32(7)) & np.uint32(0x9D2C5680)
+    y ^= (y << np.uint32(15)) & np.uint32(0xEFC60000)
+    y ^= y >> np.uint32(18)
+    return np.ascontiguousarray(y.T)
+
+def _shuffle_chunk(seeds: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Shuffled decks for 32-bit seeds, and a mask of the seeds that needed more than MT_USED outputs"""
+    count = len(seeds)
+    outputs = _mt_outputs(seeds)
+    rows = np.arange(count)
+    used = np.zeros(count, dtype=np.intp)
+    decks = np.tile(np.arange(CARD_COUNT, dtype=np.uint8), (count, 1))
+    for i in range(CARD_COUNT - 1, 0, -1):
+        bits = (i + 1).bit_length()
+        pick = np.empty(count, dtype=np.intp)
+        todo = rows
+        while len(todo) > 0:
+            value = outputs[todo, np.minimum(used[todo], MT_USED - 1)] >> np.uint32(32 - bits)
+            used[todo] += 1
+            accepted = (value <= i) | (used[todo] > MT_USED)
+            pick[todo[accepted]] = value[accepted]
+            todo = todo[~accepted]
+        swapped = decks[rows, pick]
+        decks[rows, pick] = decks[:, i]
+        decks[:, i] = swapped
+    return decks, used > MT_USED
+
+def shuffled_decks(seeds) -> np.ndarray:
+    """N x 52 card orders, row i equal to a list(range(52)) shuffled by random.Random(seeds[i])"""
+    seeds = list(seeds)
+    decks = np.empty((len(seeds), CARD_COUNT), dtype=np.uint8)
+    fast = np.array([0 <= seed < 2**32 for seed in seeds], dtype=bool)
+    rows = np.flatnonzero(fast)
+    for start in range(0, len(rows), DEAL_CHUNK):
+        chunk = rows[start:start + DEAL_CHUNK]
+        decks[chunk], overflow = _shuffle_chunk(np.array([seeds[row] for row in chunk], dtype=np.uint32))
+        fast[chunk[overflow]] = False
+    # Seeds outside 32 bits use a longer key, those and the rare overflows are shuffled one by one
+    for row in np.flatnonzero(~fast):
+        cards = list(range(CARD_COUNT))
+        random.Random(seeds[row]).shuffle(cards)
+        decks[row] = cards
+    return decks
+
+# N games of Golf Solitaire held as arrays and played in lockstep. The state arrays only hold running games,
+# finished games are dropped from them after every step and ids maps the rows back to their game number.
+class BatchGolf:
+    STATE = ("ids", "tableau", "tableau_ranks", "top_ranks", "heights", "left", "stock", "stock_size", "waste_top")
+
+    def __init__(self, decks: np.ndarray):
+        """decks is an N x 52 array of card indices in CardDeck order, dealt like GolfGame deals"""
+        decks = np.asarray(decks, dtype=np.uint8)
+        count = len(decks)
+        # Cards are dealt by popping from the end of the deck
+        dealt = decks[:, ::-1]
+        tableau_end = TABLEAU_COLUMNS * COLUMN_DEPTH
+        self.count = count
+        self.steps = 0
+        # Results per game, moves and cards_left are final once the game is finished
+        self.status = np.full(count, RUNNING, dtype=np.int8)
+        self.moves = np.zeros(count, dtype=np.int32)
+        self.cards_left = np.full(count, tableau_end, dtype=np.int8)
+
+        self.ids = np.arange(count)
+        self.tableau = dealt[:, :tableau_end].reshape(count, TABLEAU_COLUMNS, COLUMN_DEPTH).copy()
+        # Ranks per column with an empty slot in front, so ranks[n, col, height] is the rank of the top card
+        self.tableau_ranks = np.full((count, TABLEAU_COLUMNS, COLUMN_DEPTH + 1), EMPTY_RANK, dtype=np.uint8)
+        self.tableau_ranks[:, :, 1:] = self.tableau % len(CARD_VALUES)
+        self.top_ranks = self.tableau_ranks[:, :, COLUMN_DEPTH].copy()
+        self.heights = np.full((count, TABLEAU_COLUMNS), COLUMN_DEPTH, dtype=np.int8)
+        self.left = np.full(count, tableau_end, dtype=np.int8)
+        self.stock = dealt[:, tableau_end:tableau_end + STOCK_SIZE].copy()
+        self.stock_size = np.full(count, STOCK_SIZE, dtype=np.int8)
+        self.waste_top = dealt[:, tableau_end + STOCK_SIZE].copy()
+        self._rows = np.arange(count)
+        self.mask = self._finish_games(self.legal_mask())
+
+    @classmethod
+    def from_seeds(cls, seeds) -> BatchGolf:
+        """Deal the same cards as GolfGame(seed=seed) for every seed"""
+        return cls(shuffled_decks(seeds))
+
+    def running(self) -> int:
+        return len(self.ids)
+
+    def legal_mask(self) -> np.ndarray:
+        """Mask of legal moves per running game, columns 0-6 and STOCK"""
+        mask = np.empty((len(self.ids), TABLEAU_COLUMNS + 1), dtype=bool)
+        waste_ranks = self.waste_top % len(CARD_VALUES)
+        mask[:, :TABLEAU_COLUMNS] = RANK_ADJACENT[waste_ranks[:, None], self.top_ranks]
+        mask[:, STOCK] = self.stock_size > 0
+        return mask
+
+    def _finish_games(self, mask: np.ndarray) -> np.ndarray:
+        won = self.left == 0
+        # The eight booleans of a mask row read as one integer, zero means no legal move
+        done = won | (mask.view(np.uint64)[:, 0] == 0)
+        if not done.any():
+            return mask
+        finished = self.ids[done]
+        self.status[finished] = np.where(won[done], WIN, LOSE)
+        self.moves[finished] = self.steps
+        self.cards_left[finished] = self.left[done]
+        keep = ~done
+        for name in self.STATE:
+            setattr(self, name, getattr(self, name)[keep])
+        return mask[keep]
+
+    def step(self, actions: np.ndarray, mask: np.ndarray|None = None) -> np.ndarray:
+        """Apply one move (column 0-6 or STOCK) to every running game. Returns the legal mask for the games
+        still running afterwards, which can be passed back in to save recomputing it"""
+        actions = np.asarray(actions)
+        if actions.shape != (len(self.ids),):
+            raise ValueError(f"Expected one action for each of the {len(self.ids)} running games, got shape {actions.shape}")
+        if mask is None:
+            mask = self.legal_mask()
+        rows = self._rows[:len(actions)]
+        if not mask[rows, actions].all():
+            raise ValueError("Illegal move for a running game")
+
+        plays = actions != STOCK
+        played = rows[plays]
+        cols = actions[plays]
+        height = self.heights[played, cols] - 1
+        self.heights[played, cols] = height
+        self.waste_top[played] = self.tableau[played, cols, height]
+        self.top_ranks[played, cols] = self.tableau_ranks[played, cols, height]
+        self.left[played] -= 1
+
+        hits = rows[~plays]
+        self.stock_size[hits] -= 1
+        self.waste_top[hits] = self.stock[hits, self.stock_size[hits]]
+
+        self.steps += 1
+        return self._finish_games(self.legal_mask())
+
+# --- POLICIES ---
+# Vectorized versions of the policies in golf_solitaire_sim, taking the legal mask of the running games
+
+def greedy_actions(mask: np.ndarray, _rng: np.random.Generator|None = None) -> np.ndarray:
+    # First legal column, or the stock when no column fits
+    columns = mask.copy()
+    columns[:, STOCK] = True
+    return columns.argmax(axis=1)
+
+def random_actions(mask: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    # Uniform over legal moves. This draws from NumPy's generator, so games differ from the scalar random policy
+    return (rng.random(mask.shape) * mask).argmax(axis=1)
+
+policies = {
+    "greedy": greedy_actions,
+    "random": random_actions,
+}
+
+def play_batch(batch: BatchGolf, policy_name: str = "greedy", seed: int = 0) -> BatchGolf:
+    policy = policies[policy_name]
+    rng = np.random.default_rng(seed)
+    mask = batch.mask
+    while batch.running() > 0:
+        mask = batch.step(policy(mask, rng), mask)
+    return batch
+
+def main():
+    parser = argparse.ArgumentParser(description="Play seeded Golf Solitaire deals in lockstep with NumPy")
+    parser.add_argument("--start", type=int, default=0, help="first seed")
+    parser.add_argument("--count", type=int, default=100_000, help="number of deals")
+    parser.add_argument("--policy", choices=sorted(policies), default="greedy")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    batch = BatchGolf.from_seeds(range(args.start, args.start + args.count))
+    deal_time = time.perf_counter() - start_time
+    play_batch(batch, args.policy, args.start)
+    elapsed = time.perf_counter() - start_time
+    wins = int((batch.status == WIN).sum())
+    print(f"{args.count} deals, {wins} won ({wins / max(args.count, 1):.2%}), {args.count / elapsed:,.0f} deals/sec ({deal_time / elapsed:.0%} of the time spent dealing)")
+
+if __name__ == "__main__":
+    main()
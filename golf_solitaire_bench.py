@@ -0,0 +1,254 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from typing import Callable
+from golf_solitaire import GolfGame
+from golf_solitaire_engine import GolfState, TABLEAU_COLUMNS
+from golf_solitaire_render import board_lines
+from golf_solitaire_solver import Solver
+
+# CONSTANTS
+RESULTS_VERSION = 1
+THRESHOLD = 0.15 # Slowdown against the baseline, as a fraction, that counts as a regression
+SOLVER_NODES = 20_000 # Node limit per deal in the solver benchmark, keeps its run time fixed
+IMPORTS = "imports" # Name of the import time check, run along with the benchmarks
+# Most seconds a fresh interpreter may take to import a module: worker processes import the core
+# over and over and the front ends are started by hand. pygame alone takes most of the UI's budget
+IMPORT_BUDGETS = {
+    "golf_solitaire": 0.005,
+    "golf_solitaire_engine": 0.015,
+    "golf_solitaire_cli": 0.075,
+    "golf_solitaire_ui": 1.0,
+}
+
+# Greedy play through GolfGame's public methods: first column that fits, else draw from the stock
+def play_object_model(game: GolfGame) -> int:
+    while game.check_game_state() == "running":
+        for col in range(TABLEAU_COLUMNS):
+            if game.try_draw_card(col) == "Placed card on wastepile":
+                break
+        else:
+            game.draw_from_wastepile()
+    return game.moves
+
+# The same greedy play on the integer-encoded engine
+def play_engine(state: GolfState) -> int:
+    while state.check_game_state() == "running":
+        for col in range(TABLEAU_COLUMNS):
+            if state.can_play(col):
+                state.play(col)
+                break
+        else:
+            state.hit()
+    return state.moves
+
+# --- BENCHMARKS ---
+# Each benchmark does its setup for a workload of the given size and returns the timed part,
+# which returns the number of operations it did. Deals are always the seeds 0..size-1
+
+def bench_deal(size: int) -> Callable[[], int]:
+    def run():
+        for seed in range(size):
+            GolfGame(seed=seed)
+        return size
+    return run
+
+def bench_moves(size: int) -> Callable[[], int]:
+    # try_draw_card and draw_from_wastepile, with their journal entries
+    games = [GolfGame(seed=seed) for seed in range(size)]
+    return lambda: sum(play_object_model(game) for game in games)
+
+def bench_undo(size: int) -> Callable[[], int]:
+    games = [GolfGame(seed=seed) for seed in range(size)]
+    for game in games:
+        play_object_model(game)
+    def run():
+        undos = 0
+        for game in games:
+            while game.undo() == "Undone last move":
+                undos += 1
+        return undos
+    return run
+
+def _midgame_positions(size: int) -> list[GolfGame]:
+    games = []
+    for seed in range(size):
+        game = GolfGame(seed=seed)
+        rng = random.Random(seed)
+        for _ in range(rng.randrange(20)):
+            if game.check_game_state() != "running":
+                break
+            game.apply(rng.choice(game.legal_moves()))
+        games.append(game)
+    return games
+
+def bench_draw_self(size: int) -> Callable[[], int]:
+    games = _midgame_positions(size)
+    def run():
+        for game in games:
+            game.draw_self()
+        return len(games)
+    return run
+
+def bench_board_lines(size: int) -> Callable[[], int]:
+    games = _midgame_positions(size)
+    def run():
+        for game in games:
+            board_lines(game)
+        return len(games)
+    return run
+
+def bench_check_game_state(size: int) -> Callable[[], int]:
+    games = _midgame_positions(size)
+    def run():
+        for _ in range(10):
+            for game in games:
+                game.check_game_state()
+        return 10 * len(games)
+    return run
+
+def bench_random_games(size: int) -> Callable[[], int]:
+    def run():
+        for seed in range(size):
+            game = GolfGame(seed=seed)
+            rng = random.Random(seed)
+            while game.check_game_state() == "running":
+                game.apply(rng.choice(game.legal_moves()))
+        return size
+    return run
+
+def bench_engine_moves(size: int) -> Callable[[], int]:
+    states = [GolfState.from_seed(seed) for seed in range(size)]
+    return lambda: sum(play_engine(state) for state in states)
+
+def bench_solver(size: int) -> Callable[[], int]:
+    states = [GolfState.from_seed(seed) for seed in range(size)]
+    solver = Solver(SOLVER_NODES)
+    return lambda: sum(solver.solve(state).nodes for state in states)
+
+# Name: (unit, benchmark, workload size at scale 1)
+BENCHMARKS: dict[str, tuple[str, Callable[[int], Callable[[], int]], int]] = {
+    "deal": ("deals", bench_deal, 2000),
+    "moves": ("moves", bench_moves, 2000),
+    "undo": ("undos", bench_undo, 2000),
+    "draw_self": ("renders", bench_draw_self, 2000),
+    "board_lines": ("renders", bench_board_lines, 2000),
+    "check_game_state": ("calls", bench_check_game_state, 2000),
+    "random_games": ("games", bench_random_games, 500),
+    "engine_moves": ("moves", bench_engine_moves, 2000),
+    "solver": ("nodes", bench_solver, 10),
+}
+
+def measure(benchmark: Callable[[int], Callable[[], int]], size: int, repeat: int) -> float:
+    """Operations per second of the fastest of repeat runs, each on a fresh setup"""
+    best = None
+    for _ in range(repeat):
+        run = benchmark(size)
+        start = time.perf_counter()
+        ops = run()
+        elapsed = time.perf_counter() - start
+        rate = ops / elapsed if elapsed > 0 else float("inf")
+        best = rate if best is None else max(best, rate)
+    return best
+
+def import_time(module: str, repeat: int) -> float|None:
+    """Seconds a fresh interpreter takes to import module, the fastest of repeat runs as reported by
+    python -X importtime. None if it can't be imported, like the UI without pygame"""
+    best = None
+    # The first run may still have to write the bytecode cache, it doesn't count
+    for run in range(repeat + 1):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        if result.returncode != 0:
+            return None
+        # Lines are "import time: self [us] | cumulative | name", nested imports have indented names
+        for line in result.stderr.splitlines():
+            fields = line.split("|")
+            if len(fields) == 3 and fields[2] == f" {module}" and run > 0:
+                seconds = int(fields[1]) / 1e6
+                best = seconds if best is None else min(best, seconds)
+    return best
+
+def run_suite(names: list[str], scale: float = 1.0, repeat: int = 3) -> dict:
+    results = {}
+    for name in names:
+        if name == IMPORTS:
+            continue
+        unit, benchmark, size = BENCHMARKS[name]
+        results[name] = {"unit": unit, "per_second": measure(benchmark, max(1, int(size * scale)), repeat)}
+    report = {
+        "version": RESULTS_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "scale": scale,
+        "results": results,
+    }
+    if IMPORTS in names:
+        report[IMPORTS] = {module: {"seconds": import_time(module, repeat), "budget": budget} for module, budget in IMPORT_BUDGETS.items()}
+    return report
+
+def compare(report: dict, baseline: dict, threshold: float = THRESHOLD) -> list[str]:
+    """Benchmarks more than threshold slower than in the baseline"""
+    regressions = []
+    for name, result in report["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            continue
+        change = result["per_second"] / before["per_second"] - 1
+        if change < -threshold:
+            regressions.append(f"{name}: {result['per_second']:,.0f} {result['unit']}/sec, {change:.1%} against {before['per_second']:,.0f}")
+    return regressions
+
+def over_budget(report: dict) -> list[str]:
+    """Modules that took longer to import than their budget"""
+    return [
+        f"import {module}: {result['seconds'] * 1000:.1f} ms, budget {result['budget'] * 1000:.0f} ms"
+        for module, result in report.get(IMPORTS, {}).items()
+        if result["seconds"] is not None and result["seconds"] > result["budget"]
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Golf Solitaire hot paths")
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run, all by default: {', '.join(BENCHMARKS)}, {IMPORTS}")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every workload size")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark, the fastest counts")
+    parser.add_argument("--json", metavar="PATH", help="write the results as JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="JSON results to compare against, exits with 1 on a regression")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="allowed slowdown against the baseline")
+    args = parser.parse_args()
+    unknown = [name for name in args.names if name not in BENCHMARKS and name != IMPORTS]
+    if unknown:
+        parser.error(f"unknown benchmark {', '.join(unknown)}")
+
+    report = run_suite(args.names or [*BENCHMARKS, IMPORTS], args.scale, args.repeat)
+    for name, result in report["results"].items():
+        print(f"{name + ':':18}{result['per_second']:14,.0f} {result['unit']}/sec")
+    results = report["results"]
+    if "moves" in results and "engine_moves" in results:
+        print(f"{'engine speedup:':18}{results['engine_moves']['per_second'] / results['moves']['per_second']:14.1f}x")
+    for module, result in report.get(IMPORTS, {}).items():
+        seconds = "not importable" if result["seconds"] is None else f"{result['seconds'] * 1000:.1f} ms"
+        print(f"import {module}: {seconds} (budget {result['budget'] * 1000:.0f} ms)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+    slow_imports = over_budget(report)
+    for slow_import in slow_imports:
+        print(f"OVER BUDGET {slow_import}")
+    if slow_imports:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
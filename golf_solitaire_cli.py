@@ -1,110 +1,91 @@
-from golf_solitaire import GolfGame
-from typing import Callable, Dict, Any
-import re
-import os
+import sys
+from typing import Iterable, TextIO
+from golf_solitaire_commands import GameSession, handle_parse
+from golf_solitaire_render import TerminalRenderer, board_lines
 
-state = "running"
-command_list =[
-    "List of commands",
-    "D [1-7]: Draw the top card from said pile",
-    "S:       Draw a card from the stock pile",
-    "H:       List all commands",
-    "U:       Undo last move",
-    "X:       Exit the program"
-    "R:       Restart game",
-]
+# Script lines that print the board, anything after a "#" is a comment
+PRINT_COMMAND = "P"
+COMMENT = "#"
 
-FACE_MAPPING = {
-    "H": "♡",
-    "S": "♠",
-    "C": "♣",
-    "D": "♢"
-}
-CommandFunc = Callable[[str], str]
-pattern = re.compile(r"^(D\s+([1-7]))|(H)|(S)|(U)|(X)|(R)$", re.I)
+def status_line(session: GameSession) -> str:
+    if session.state == "win":
+        return "You've won! Press (R) to play again"
+    if session.state == "lose":
+        return "You've lost! Press (R) to play again"
+    return ""
 
-def clear_screen():
-    # Clear the terminal screen based on the operating system
-    if os.name == 'nt':  # Windows
-        os.system('cls')
-    else:  # Linux, macOS
-        os.system('clear')
-game = GolfGame()
+def board_text(session: GameSession) -> str:
+    return "\n".join(board_lines(session.game) + [status_line(session), ""])
 
-def handle_draw(value: str) -> str:
-    col_index = int(value) - 1
-    return game.try_draw_card(col_index)
+def play(session: GameSession, renderer: TerminalRenderer):
+    """Interactive game, redraws only the parts of the board that changed since the last turn"""
+    result: str = ""
+    while session.state != "exit":
+        session.state = session.game.check_game_state()
+        result = status_line(session) or result
+        renderer.render(board_lines(session.game) + result.split("\n") + ["", "Make your move. Press H for help"])
+        choice: str = renderer.read_line()
+        result = handle_parse(session, choice)
 
-def handle_hit(_value: str) -> str:
-    return game.draw_from_wastepile()
+def run_script(session: GameSession, commands: Iterable[str], out: TextIO|None = None, verbose: bool = False) -> int:
+    """Run commands one after another without rendering in between. P writes the board to out,
+    with verbose every response is written too. Stops at X, returns the number of commands run"""
+    count = 0
+    for line in commands:
+        command = line.split(COMMENT, 1)[0].strip()
+        if not command:
+            continue
+        count += 1
+        if command.upper() == PRINT_COMMAND:
+            if out is not None:
+                out.write(board_text(session))
+            continue
+        result = handle_parse(session, command)
+        if verbose and out is not None:
+            out.write(f"> {command}\n{result}\n")
+        if session.state == "exit":
+            break
+        session.state = session.game.check_game_state()
+    return count
 
-def handle_help(_value: str) -> str:
-    return "\n".join(command_list)
-
-def handle_undo(_value: str)-> str:
-    return game.undo()
-
-def handle_exit(_value: str) -> str:
-    global state
-    state = "exit"
-    return "Exiting game"
-
-def handle_restart(_value: str) -> str:
-    global game
-    game = GolfGame()
-    return "Restart"
-
-command_map: Dict[str, CommandFunc] = {
-        'D': handle_draw,
-        'S': handle_hit,
-        'H': handle_help,
-        'U': handle_undo,
-        'X': handle_exit,
-        'R': handle_restart,
-    }
+def run_session(session: GameSession, script: str|None = None, verbose: bool = False, quiet: bool = False) -> int:
+    """Play interactively, or run the script at path script (- for stdin) and print the final board"""
+    if script is None and sys.stdin.isatty():
+        play(session, TerminalRenderer())
+        return 0
+    if script in (None, "-"):
+        commands = sys.stdin.read().splitlines()
+    else:
+        with open(script) as f:
+            commands = f.read().splitlines()
+    run_script(session, commands, sys.stdout, verbose)
+    if not quiet:
+        sys.stdout.write(board_text(session))
+    return 0
 
-def handle_parse(command_string: str) -> str:
-    match = pattern.match(command_string.strip())
+def main(argv: list[str]|None = None) -> int:
+    # Only needed when run as a program, scripts driven through run_script never load it
+    import argparse
+    parser = argparse.ArgumentParser(description="Play Golf Solitaire on the command line, or run a script of commands")
+    parser.add_argument("--script", metavar="PATH", help="run the commands in PATH (- for stdin) and print the final board, piped input is a script too")
+    parser.add_argument("--seed", type=int, default=None, help="deal this seed")
+    parser.add_argument("--max-history", type=int, default=None, help="moves that can be undone")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print the response to every script command")
+    parser.add_argument("-q", "--quiet", action="store_true", help="don't print the final board of a script")
+    parser.add_argument("--save", metavar="DIR", help="keep the game in a session directory, every move is saved and the game resumes on the next start")
+    parser.add_argument("--session", default="default", help="name of the saved session (default: %(default)s)")
+    args = parser.parse_args(argv)
 
-    if not match:
-        return f"❌ ERROR: Invalid command format: '{command_string.strip()}'"
+    if args.save is None:
+        return run_session(GameSession(args.seed, args.max_history), args.script, args.verbose, args.quiet)
+    # Only loaded when sessions are saved
+    from golf_solitaire_store import SessionStore
+    with SessionStore(args.save, args.max_history) as store:
+        try:
+            session = store.open(args.session, args.seed)
+        except ValueError as e:
+            parser.error(str(e))
+        return run_session(session, args.script, args.verbose, args.quiet)
 
-    # Determine which command was matched (Groups 1-4)
-    elif match.group(2): # D [1-7] was matched
-        command_type = 'D'
-        command_value = match.group(2) # The number [1-7]
-    elif match.group(3): # H was matched
-        command_type = 'H'
-        command_value = ''
-    elif match.group(4): # S was matched
-        command_type = 'S'
-        command_value = ''
-    elif match.group(5): # U was matched
-        command_type = 'U'
-        command_value = ''
-    elif match.group(6):
-        command_type = 'X'
-        command_value = ''
-    elif match.group(7):
-        command_type = 'R'
-        command_value = ''
-    else:
-        # Should be unreachable given the regex pattern
-        return "❌ ERROR: Parsing error."
-    # Execute the mapped function
-    action_func = command_map[command_type]
-    return action_func(command_value)
-    
-result: str = ""
-while state != "exit":
-    state = game.check_game_state()
-    if state == "win":
-        result = "You've won! Press (R) to play again"
-    elif state == "lose":
-        result = "You've lost! Press (R) to play again"
-    clear_screen()
-    print(game.draw_self())
-    print(result)
-    print()
-    choice: str = input("Make your move. Press H for help\n")
-    result = handle_parse(choice)
\ No newline at end of file
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+from golf_solitaire import GolfGame
+from typing import Callable, Dict
+import re
+
+command_list =[
+    "List of commands",
+    "D [1-7]: Draw the top card from said pile",
+    "S:       Draw a card from the stock pile",
+    "H:       List all commands",
+    "U:       Undo last move",
+    "Y:       Redo last undone move",
+    "X:       Exit the program",
+    "R:       Restart game",
+    "T:       Hint, suggest the move that wins most often",
+]
+
+pattern = re.compile(r"^(D\s+([1-7]))|(H)|(S)|(U)|(X)|(R)|(T)|(Y)$", re.I)
+
+# One player's game, with the state the command loop runs on
+class GameSession:
+    def __init__(self, seed: int|None = None, max_history: int|None = None):
+        self.max_history = max_history
+        self.state = "running"
+        self.new_game(seed)
+
+    def new_game(self, seed: int|None = None):
+        self.game = GolfGame(seed=seed, max_history=self.max_history)
+
+CommandFunc = Callable[[GameSession, str], str]
+
+def handle_draw(session: GameSession, value: str) -> str:
+    col_index = int(value) - 1
+    return session.game.try_draw_card(col_index)
+
+def handle_hit(session: GameSession, _value: str) -> str:
+    return session.game.draw_from_wastepile()
+
+def handle_help(_session: GameSession, _value: str) -> str:
+    return "\n".join(command_list)
+
+def handle_undo(session: GameSession, _value: str)-> str:
+    return session.game.undo()
+
+def handle_redo(session: GameSession, _value: str) -> str:
+    return session.game.redo()
+
+def handle_exit(session: GameSession, _value: str) -> str:
+    session.state = "exit"
+    return "Exiting game"
+
+def handle_restart(session: GameSession, _value: str) -> str:
+    session.new_game()
+    return "Restart"
+
+def handle_hint(session: GameSession, _value: str) -> str:
+    # The hint engine brings in multiprocessing, only load it when a hint is asked for
+    import golf_solitaire_hint
+    hint = golf_solitaire_hint.suggest(session.game)
+    if hint is None:
+        return "No moves left"
+    return f"Hint: {hint.command()} (won {hint.win_rate:.0%} of {hint.playouts} playouts)"
+
+command_map: Dict[str, CommandFunc] = {
+        'D': handle_draw,
+        'S': handle_hit,
+        'H': handle_help,
+        'U': handle_undo,
+        'X': handle_exit,
+        'R': handle_restart,
+        'T': handle_hint,
+        'Y': handle_redo,
+    }
+
+def handle_parse(session: GameSession, command_string: str) -> str:
+    match = pattern.match(command_string.strip())
+
+    if not match:
+        return f"❌ ERROR: Invalid command format: '{command_string.strip()}'"
+
+    # Determine which command was matched (Groups 1-4)
+    elif match.group(2): # D [1-7] was matched
+        command_type = 'D'
+        command_value = match.group(2) # The number [1-7]
+    elif match.group(3): # H was matched
+        command_type = 'H'
+        command_value = ''
+    elif match.group(4): # S was matched
+        command_type = 'S'
+        command_value = ''
+    elif match.group(5): # U was matched
+        command_type = 'U'
+        command_value = ''
+    elif match.group(6):
+        command_type = 'X'
+        command_value = ''
+    elif match.group(7):
+        command_type = 'R'
+        command_value = ''
+    elif match.group(8):
+        command_type = 'T'
+        command_value = ''
+    elif match.group(9):
+        command_type = 'Y'
+        command_value = ''
+    else:
+        # Should be unreachable given the regex pattern
+        return "❌ ERROR: Parsing error."
+    # Execute the mapped function
+    action_func = command_map[command_type]
+    return action_func(session, command_value)
@@ -0,0 +1,211 @@
+import argparse
+import bisect
+import mmap
+import multiprocessing
+import os
+import random
+import struct
+import time
+from typing import Iterator, Sequence
+from golf_solitaire import CARD_COUNT, GolfGame
+from golf_solitaire_engine import GolfState
+from golf_solitaire_files import write_atomic
+from golf_solitaire_solver import Solver
+
+# --- DEAL DATABASE FILE ---
+# A header (magic, entry count, index stride), the sparse index and the entries. Entries are fixed
+# size and sorted by difficulty, then seed:
+#   difficulty (uint32), seed (uint64), status (1 byte), minimum moves (1 byte, 0 if the shortest win
+#   wasn't found within the node limit), dead ends (uint32), the deal as 52 card indices in CardDeck order
+# Everything is big-endian, so sorting the packed entries as bytes sorts them by difficulty.
+# The index holds the difficulty of every INDEX_STRIDE-th entry, small enough to keep in memory:
+# a lookup bisects the index, then the one block of entries it points to.
+DEALDB_MAGIC = b"GSD1"
+HEADER = struct.Struct(">4sII")
+INDEX_ENTRY = struct.Struct(">I")
+ENTRY = struct.Struct(f">IQBBI{CARD_COUNT}s")
+MIN_MOVES_OFFSET = 13
+INDEX_STRIDE = 1024
+
+# Status of a deal
+UNSOLVABLE = 0
+SOLVABLE = 1
+UNKNOWN = 2 # The solver hit its node limit
+
+# Difficulty is the number of dead ends the solver ran into before finding a win. Deals without a
+# known win sort after every solvable deal
+DIFFICULTY_UNKNOWN = 0xFFFFFFFE
+DIFFICULTY_UNSOLVABLE = 0xFFFFFFFF
+MAX_NODES = 2_000_000
+
+# One deal of the database
+class CorpusEntry:
+    __slots__ = ("difficulty", "seed", "status", "min_moves", "dead_ends", "deal")
+
+    def __init__(self, difficulty: int, seed: int, status: int, min_moves: int, dead_ends: int, deal: bytes):
+        self.difficulty = difficulty
+        self.seed = seed
+        self.status = status
+        self.min_moves = min_moves or None # None if the shortest win wasn't found within the node limit
+        self.dead_ends = dead_ends
+        self.deal = deal
+
+    def __repr__(self):
+        status = ["unsolvable", "solvable", "unknown"][self.status]
+        return f"CorpusEntry(seed={self.seed}, {status}, difficulty={self.difficulty}, min_moves={self.min_moves}, dead_ends={self.dead_ends})"
+
+    @property
+    def solvable(self) -> bool|None:
+        return None if self.status == UNKNOWN else self.status == SOLVABLE
+
+    def game(self, max_history: int|None = None) -> GolfGame:
+        return GolfGame.from_corpus_entry(self, max_history)
+
+# --- BUILDING ---
+
+def analyze_deal(seed: int, solver: Solver) -> bytes:
+    """Solve one seeded deal and pack its entry"""
+    cards = list(range(CARD_COUNT))
+    random.Random(seed).shuffle(cards)
+    state = GolfState.from_deck(cards)
+    result = solver.solve(state)
+    min_moves = 0
+    if result.winnable is None:
+        status, difficulty = UNKNOWN, DIFFICULTY_UNKNOWN
+    elif not result.winnable:
+        status, difficulty = UNSOLVABLE, DIFFICULTY_UNSOLVABLE
+    else:
+        status, difficulty = SOLVABLE, min(result.dead_ends, DIFFICULTY_UNKNOWN - 1)
+        shortest = solver.solve(state, shortest=True)
+        if shortest.winnable:
+            min_moves = len(shortest.line)
+    return ENTRY.pack(difficulty, seed, status, min_moves, result.dead_ends, bytes(cards))
+
+def analyze_chunk(task: tuple[int, int, int|None]) -> bytes:
+    start, stop, max_nodes = task
+    solver = Solver(max_nodes)
+    return b"".join(analyze_deal(seed, solver) for seed in range(start, stop))
+
+def build(path: str, start: int, count: int, max_nodes: int|None = MAX_NODES, workers: int|None = None, chunk_size: int = 100) -> int:
+    """Solve seeds start..start+count-1 across worker processes and write the sorted database to path.
+    Returns the number of solvable deals"""
+    tasks = [(seed, min(seed + chunk_size, start + count), max_nodes) for seed in range(start, start + count, chunk_size)]
+    entries: list[bytes] = []
+    with multiprocessing.Pool(workers) as pool:
+        for chunk in pool.imap_unordered(analyze_chunk, tasks):
+            entries.extend(chunk[i:i + ENTRY.size] for i in range(0, len(chunk), ENTRY.size))
+    write(path, entries)
+    return sum(ENTRY.unpack(entry)[2] == SOLVABLE for entry in entries)
+
+def write(path: str, entries: list[bytes], stride: int = INDEX_STRIDE):
+    """Sort packed entries and write them with their index to path"""
+    entries = sorted(entries)
+    index = [INDEX_ENTRY.pack(INDEX_ENTRY.unpack_from(entries[i])[0]) for i in range(0, len(entries), stride)]
+    write_atomic(path, HEADER.pack(DEALDB_MAGIC, len(entries), stride), *index, *entries)
+
+# --- QUERYING ---
+
+# Read-only view of a database file through a memory map
+class DealDatabase:
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.data) < HEADER.size:
+            raise ValueError(f"{path} is not a deal database")
+        magic, self.count, self.stride = HEADER.unpack_from(self.data)
+        if magic != DEALDB_MAGIC:
+            raise ValueError(f"{path} is not a deal database")
+        blocks = (self.count + self.stride - 1) // self.stride
+        self.index = [difficulty for (difficulty,) in INDEX_ENTRY.iter_unpack(self.data[HEADER.size:HEADER.size + blocks * INDEX_ENTRY.size])]
+        self.base = HEADER.size + blocks * INDEX_ENTRY.size
+        if self.base + self.count * ENTRY.size != len(self.data):
+            raise ValueError(f"{path}: expected {self.count} entries, the file is truncated")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        self.close()
+
+    def close(self):
+        self.data.close()
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, position: int) -> CorpusEntry:
+        if not 0 <= position < self.count:
+            raise IndexError("deal database index out of range")
+        return CorpusEntry(*ENTRY.unpack_from(self.data, self.base + position * ENTRY.size))
+
+    def difficulty(self, position: int) -> int:
+        return INDEX_ENTRY.unpack_from(self.data, self.base + position * ENTRY.size)[0]
+
+    def lower_bound(self, difficulty: int) -> int:
+        """Position of the first entry at least this difficult, in O(log n)"""
+        block = bisect.bisect_left(self.index, difficulty)
+        # Entries before the start of that block, back to the start of the one before, may still qualify
+        low = max(block - 1, 0) * self.stride
+        high = min(block * self.stride, self.count)
+        while low < high:
+            mid = (low + high) // 2
+            if self.difficulty(mid) < difficulty:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def min_moves_known(self, position: int) -> bool:
+        return self.data[self.base + position * ENTRY.size + MIN_MOVES_OFFSET] != 0
+
+    def band(self, low: int, high: int, min_moves_known: bool = False) -> Sequence[int]:
+        """Positions of the entries with low <= difficulty < high, only those whose fewest moves are known
+        if min_moves_known"""
+        band = range(self.lower_bound(low), self.lower_bound(high))
+        if min_moves_known:
+            return [position for position in band if self.min_moves_known(position)]
+        return band
+
+    def entries(self, low: int, high: int, min_moves_known: bool = False) -> Iterator[CorpusEntry]:
+        for position in self.band(low, high, min_moves_known):
+            yield self[position]
+
+    def pick(self, low: int, high: int, number: int, min_moves_known: bool = False) -> CorpusEntry:
+        """A deal of the band chosen by number, e.g. the day for a daily deal. Raises LookupError for an empty band"""
+        band = self.band(low, high, min_moves_known)
+        if not band:
+            raise LookupError(f"No deals with difficulty {low} to {high}")
+        return self[band[number % len(band)]]
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and query a database of solved Golf Solitaire deals sorted by difficulty")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="solve seeded deals and write the database")
+    build_parser.add_argument("--start", type=int, default=0, help="first seed")
+    build_parser.add_argument("--count", type=int, default=10_000, help="number of deals")
+    build_parser.add_argument("--max-nodes", type=int, default=MAX_NODES, help="give up on a deal after this many nodes")
+    build_parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    build_parser.add_argument("--chunk-size", type=int, default=100, help="deals per worker task")
+    build_parser.add_argument("--out", default="deals.db", help="database file")
+    query_parser = commands.add_parser("query", help="list the deals of a difficulty band")
+    query_parser.add_argument("path", help="database file")
+    query_parser.add_argument("--min", type=int, default=0, help="lowest difficulty, inclusive")
+    query_parser.add_argument("--max", type=int, default=DIFFICULTY_UNKNOWN, help="highest difficulty, exclusive")
+    query_parser.add_argument("--limit", type=int, default=10, help="entries to print")
+    query_parser.add_argument("--min-moves-known", action="store_true", help="only deals whose fewest moves are known")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        start_time = time.perf_counter()
+        solvable = build(args.out, args.start, args.count, args.max_nodes, args.workers, args.chunk_size)
+        elapsed = time.perf_counter() - start_time
+        print(f"{args.count} deals, {solvable} solvable, {args.count / elapsed:,.1f} deals/sec on {args.workers} workers")
+        return
+    with DealDatabase(args.path) as db:
+        band = db.band(args.min, args.max, args.min_moves_known)
+        print(f"{len(band)} of {len(db)} deals with difficulty {args.min} to {args.max}")
+        for position in band[:args.limit]:
+            print(db[position])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import random
+from golf_solitaire import ADJACENT, CARD_COUNT, CARD_VALUES, COLUMN_DEPTH, STOCK, STOCK_SIZE, TABLEAU_COLUMNS, GolfGame, unrank_deal
+
+# Compact state of a game of Golf Solitaire, with cards stored as their index (0-51). This is a
+# separate fast path for simulations and search, GolfGame stays the object model of the front ends.
+# Both implement the rules, test_golf_solitaire_engine.py plays them side by side to keep them the same
+class GolfState:
+    __slots__ = ("tableau", "heights", "stock", "stock_size", "waste", "waste_size", "moves")
+
+    def __init__(self):
+        # Column i holds its cards bottom to top in tableau[i*COLUMN_DEPTH:i*COLUMN_DEPTH+heights[i]]
+        self.tableau: bytearray = bytearray(TABLEAU_COLUMNS * COLUMN_DEPTH)
+        self.heights: bytearray = bytearray(TABLEAU_COLUMNS)
+        self.stock: bytearray = bytearray(STOCK_SIZE)
+        self.stock_size: int = 0
+        self.waste: bytearray = bytearray(CARD_COUNT)
+        self.waste_size: int = 0
+        self.moves: int = 0
+
+    def __repr__(self):
+        columns = [list(self.column(col)) for col in range(TABLEAU_COLUMNS)]
+        return f"GolfState(tableau={columns}, stock={list(self.stock[:self.stock_size])}, waste={list(self.waste[:self.waste_size])})"
+
+    @classmethod
+    def from_deck(cls, cards: list[int]) -> GolfState:
+        """Deal card indices the same way GolfGame deals a CardDeck (popping from the end)"""
+        state = cls()
+        top = len(cards)
+        for col in range(TABLEAU_COLUMNS):
+            base = col * COLUMN_DEPTH
+            for depth in range(COLUMN_DEPTH):
+                top -= 1
+                state.tableau[base + depth] = cards[top]
+            state.heights[col] = COLUMN_DEPTH
+        for i in range(STOCK_SIZE):
+            top -= 1
+            state.stock[i] = cards[top]
+        state.stock_size = STOCK_SIZE
+        state.waste[0] = cards[top - 1]
+        state.waste_size = 1
+        return state
+
+    @classmethod
+    def from_seed(cls, seed: int) -> GolfState:
+        """Deal the same cards as GolfGame(seed=seed)"""
+        # A shuffle only depends on the list length, so shuffling indices matches shuffling a CardDeck
+        cards = list(range(CARD_COUNT))
+        random.Random(seed).shuffle(cards)
+        return cls.from_deck(cards)
+
+    @classmethod
+    def from_deal_id(cls, deal_id: int) -> GolfState:
+        """Deal the same cards as GolfGame.from_deal_id(deal_id)"""
+        return cls.from_deck(unrank_deal(deal_id))
+
+    @classmethod
+    def from_game(cls, game: GolfGame) -> GolfState:
+        state = cls()
+        for col, pile in enumerate(game.tableau):
+            base = col * COLUMN_DEPTH
+            state.tableau[base:base + len(pile)] = pile.indices
+            state.heights[col] = len(pile)
+        state.stock[:len(game.stockpile)] = game.stockpile.indices
+        state.stock_size = len(game.stockpile)
+        state.waste[:len(game.wastepile)] = game.wastepile.indices
+        state.waste_size = len(game.wastepile)
+        state.moves = game.moves
+        return state
+
+    def copy(self) -> GolfState:
+        state = GolfState.__new__(GolfState)
+        state.tableau = self.tableau[:]
+        state.heights = self.heights[:]
+        state.stock = self.stock[:]
+        state.stock_size = self.stock_size
+        state.waste = self.waste[:]
+        state.waste_size = self.waste_size
+        state.moves = self.moves
+        return state
+
+    def column(self, col: int) -> bytearray:
+        base = col * COLUMN_DEPTH
+        return self.tableau[base:base + self.heights[col]]
+
+    def column_top(self, col: int) -> int|None:
+        height = self.heights[col]
+        if height == 0:
+            return None
+        return self.tableau[col * COLUMN_DEPTH + height - 1]
+
+    def waste_top(self) -> int|None:
+        if self.waste_size == 0:
+            return None
+        return self.waste[self.waste_size - 1]
+
+    # --- Fast path, used by simulations. play() and hit() do not validate their move ---
+
+    def can_play(self, col: int) -> bool:
+        height = self.heights[col]
+        return height > 0 and self.waste_size > 0 and ADJACENT[self.waste[self.waste_size - 1]][self.tableau[col * COLUMN_DEPTH + height - 1]] == 1
+
+    def play(self, col: int):
+        height = self.heights[col] - 1
+        self.heights[col] = height
+        self.waste[self.waste_size] = self.tableau[col * COLUMN_DEPTH + height]
+        self.waste_size += 1
+        self.moves += 1
+
+    def hit(self):
+        self.stock_size -= 1
+        self.waste[self.waste_size] = self.stock[self.stock_size]
+        self.waste_size += 1
+        self.moves += 1
+
+    # Moves are column indices 0-6 or STOCK
+    def legal_moves(self) -> list[int]:
+        moves = [col for col in range(TABLEAU_COLUMNS) if self.can_play(col)]
+        if self.stock_size > 0:
+            moves.append(STOCK)
+        return moves
+
+    def apply(self, move: int):
+        if move == STOCK:
+            self.hit()
+        else:
+            self.play(move)
+
+    # Takes back a move made with play(), hit() or apply(), the moved card is still in its old slot
+    def revert(self, move: int):
+        self.waste_size -= 1
+        self.moves -= 1
+        if move == STOCK:
+            self.stock_size += 1
+        else:
+            self.heights[move] += 1
+
+    # Compact key of a position within one deal: column heights, stock position and waste top
+    def key(self) -> int:
+        heights = self.heights
+        key = 0
+        for col in range(TABLEAU_COLUMNS):
+            key = (key << 3) | heights[col]
+        return (((key << 4) | self.stock_size) << 6) | self.waste[self.waste_size - 1]
+
+    def cards_left(self) -> int:
+        return sum(self.heights)
+
+    # --- Same public methods as GolfGame ---
+
+    def try_draw_card(self, row) -> str:
+        newCard = self.column_top(row)
+        topCard = self.waste_top()
+        if newCard is not None:
+            if topCard is not None:
+                if ADJACENT[topCard][newCard]:
+                    self.play(row)
+                    return "Placed card on wastepile"
+                return f"Move not allowed! {CARD_VALUES[topCard % len(CARD_VALUES)]} vs. {CARD_VALUES[newCard % len(CARD_VALUES)]}"
+            return "No cards on wastepile"
+        return "No cards on selected pile"
+
+    def draw_from_wastepile(self) -> str:
+        if self.stock_size > 0:
+            self.hit()
+            return "Drew a card from the stockpile"
+        return "No more cards on the stockpile"
+
+    def check_game_state(self) -> str:
+        if not any(self.heights):
+            return "win"
+        if self.stock_size == 0:
+            for col in range(TABLEAU_COLUMNS):
+                if self.can_play(col):
+                    return "running"
+            return "lose"
+        return "running"
@@ -0,0 +1,243 @@
+import argparse
+import multiprocessing
+import time
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+from golf_solitaire import CARD_COUNT, COLUMN_DEPTH, STOCK, TABLEAU_COLUMNS, GolfGame
+
+# CONSTANTS
+ACTION_COUNT = TABLEAU_COLUMNS + 1 # Actions 0-6 play the top card of a column, STOCK (7) draws from the stockpile
+# Observation layout, one byte per entry. Cards are stored as their index + 1, 0 is an empty slot
+OBS_TABLEAU = 0 # Column i bottom to top from OBS_TABLEAU + i*COLUMN_DEPTH
+OBS_WASTE_TOP = OBS_TABLEAU + TABLEAU_COLUMNS * COLUMN_DEPTH
+OBS_STOCK_LEFT = OBS_WASTE_TOP + 1 # Number of cards on the stockpile, their order is hidden
+OBS_PLAYED = OBS_STOCK_LEFT + 1 # 1 for every card on the wastepile, by card index
+OBS_SIZE = OBS_PLAYED + CARD_COUNT
+OBS_DTYPE = np.uint8
+
+# Reinforcement learning environment around GolfGame with the reset/step interface of Gym.
+# The observation and the action mask are arrays owned by the environment, or given to it as rows
+# of a larger buffer. Steps update them in place and return the same arrays every time
+class GolfEnv:
+    def __init__(self, observation: np.ndarray|None = None, action_mask: np.ndarray|None = None):
+        self.observation = np.zeros(OBS_SIZE, dtype=OBS_DTYPE) if observation is None else observation
+        self.action_mask = np.zeros(ACTION_COUNT, dtype=bool) if action_mask is None else action_mask
+        self.info = {"action_mask": self.action_mask}
+        self.game: GolfGame|None = None
+
+    def reset(self, seed: int|None = None) -> tuple[np.ndarray, dict]:
+        """Deal a new game, the same one as GolfGame(seed=seed). Returns (observation, info)"""
+        # No undo in an environment, so the game keeps no history
+        game = self.game = GolfGame(seed, max_history=0)
+        obs = self.observation
+        obs[:] = 0
+        for col, pile in enumerate(game.tableau):
+            base = OBS_TABLEAU + col * COLUMN_DEPTH
+            for depth, index in enumerate(pile.indices):
+                obs[base + depth] = index + 1
+        for index in game.wastepile.indices:
+            obs[OBS_PLAYED + index] = 1
+        obs[OBS_WASTE_TOP] = game.wastepile.indices[-1] + 1
+        obs[OBS_STOCK_LEFT] = len(game.stockpile)
+        self._update_mask()
+        return obs, self.info
+
+    def step(self, action: int) -> tuple[np.ndarray, float, bool, bool, dict]:
+        """Play an action, returns (observation, reward, terminated, truncated, info). The reward is 1 for
+        every card played from the tableau. Raises ValueError for an action the mask rules out"""
+        game = self.game
+        if game is None:
+            raise RuntimeError("Call reset() before step()")
+        if not 0 <= action < ACTION_COUNT or not self.action_mask[action]:
+            raise ValueError(f"Action {action} is not legal in this position")
+        # legal_moves() has at most one move per source
+        move = next(move for move in game.legal_moves() if move.source == action)
+        game.apply(move)
+        obs = self.observation
+        if action == STOCK:
+            obs[OBS_STOCK_LEFT] -= 1
+            reward = 0.0
+        else:
+            obs[OBS_TABLEAU + action * COLUMN_DEPTH + len(game.tableau[action])] = 0
+            reward = 1.0
+        obs[OBS_WASTE_TOP] = move.card.index + 1
+        obs[OBS_PLAYED + move.card.index] = 1
+        self._update_mask()
+        return obs, reward, game.check_game_state() != "running", False, self.info
+
+    def _update_mask(self):
+        game = self.game
+        mask = self.action_mask
+        topCard = game.wastepile.peek_card()
+        for col, pile in enumerate(game.tableau):
+            card = pile.peek_card()
+            mask[col] = card is not None and topCard is not None and card.can_place_on_top(topCard)
+        mask[STOCK] = len(game.stockpile) > 0
+
+# --- VECTOR ENVIRONMENT ---
+
+# Environments first..first+count-1 of a vector environment, working on rows of its arrays
+class _EnvGroup:
+    def __init__(self, arrays: tuple[np.ndarray, ...], first: int, count: int, num_envs: int):
+        observations, action_masks, self.rewards, self.terminated, self.actions = arrays
+        self.rows = range(first, first + count)
+        self.envs = [GolfEnv(observations[i], action_masks[i]) for i in self.rows]
+        self.num_envs = num_envs
+        self.seeds: list[int|None] = [None] * count
+
+    def reset(self, seed: int|None):
+        for k, i in enumerate(self.rows):
+            self.seeds[k] = None if seed is None else seed + i
+            self.envs[k].reset(self.seeds[k])
+        self.rewards[self.rows.start:self.rows.stop] = 0
+        self.terminated[self.rows.start:self.rows.stop] = False
+
+    def step(self):
+        rewards, terminated, actions = self.rewards, self.terminated, self.actions
+        for k, i in enumerate(self.rows):
+            env = self.envs[k]
+            if terminated[i]:
+                # A finished game is replaced on the step after it ended, its action is ignored.
+                # Environment i plays seeds seed + i, seed + i + num_envs, ...
+                seed = self.seeds[k]
+                if seed is not None:
+                    seed = self.seeds[k] = seed + self.num_envs
+                env.reset(seed)
+                rewards[i] = 0.0
+                terminated[i] = False
+            else:
+                _obs, rewards[i], terminated[i], _truncated, _info = env.step(int(actions[i]))
+
+def _worker(conn, specs: list[tuple[str, tuple[int, ...], str]], first: int, count: int, num_envs: int):
+    # The parent process owns the shared memory, workers only attach to it
+    blocks = [SharedMemory(name, track=False) for name, _shape, _dtype in specs]
+    arrays = tuple(np.ndarray(shape, dtype, buffer=block.buf) for block, (_name, shape, dtype) in zip(blocks, specs))
+    group = _EnvGroup(arrays, first, count, num_envs)
+    try:
+        while True:
+            command, seed = conn.recv()
+            if command == "close":
+                break
+            try:
+                if command == "reset":
+                    group.reset(seed)
+                else:
+                    group.step()
+                conn.send(None)
+            except Exception as e:
+                conn.send(e)
+    finally:
+        # The views have to go before the memory can be closed
+        del group, arrays
+        for block in blocks:
+            block.close()
+
+# Steps num_envs games in one call. Observations, action masks, rewards and terminations are rows
+# of preallocated arrays, updated in place. With workers the games are split between subprocesses
+# and the arrays live in shared memory, so results are never copied or pickled
+class GolfVectorEnv:
+    def __init__(self, num_envs: int, workers: int = 0):
+        self.num_envs = num_envs
+        self.workers = min(workers, num_envs)
+        self._blocks: list[SharedMemory] = []
+        self._specs: list[tuple[str, tuple[int, ...], str]] = []
+        self.observations = self._array((num_envs, OBS_SIZE), OBS_DTYPE)
+        self.action_masks = self._array((num_envs, ACTION_COUNT), np.bool_)
+        self.rewards = self._array((num_envs,), np.float32)
+        self.terminated = self._array((num_envs,), np.bool_)
+        self.actions = self._array((num_envs,), np.int8)
+        self.truncated = np.zeros(num_envs, dtype=bool) # Games always end by the rules
+        self.info = {"action_mask": self.action_masks}
+        arrays = (self.observations, self.action_masks, self.rewards, self.terminated, self.actions)
+        self._group: _EnvGroup|None = None
+        self._connections = []
+        self._processes = []
+        if not self.workers:
+            self._group = _EnvGroup(arrays, 0, num_envs, num_envs)
+            return
+        for w in range(self.workers):
+            first, stop = num_envs * w // self.workers, num_envs * (w + 1) // self.workers
+            conn, child_conn = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_worker, args=(child_conn, self._specs, first, stop - first, num_envs), daemon=True)
+            process.start()
+            self._connections.append(conn)
+            self._processes.append(process)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        self.close()
+
+    def _array(self, shape: tuple[int, ...], dtype) -> np.ndarray:
+        if not self.workers:
+            return np.zeros(shape, dtype=dtype)
+        dtype = np.dtype(dtype)
+        # New shared memory is zero filled
+        block = SharedMemory(create=True, size=max(int(np.prod(shape)) * dtype.itemsize, 1))
+        self._blocks.append(block)
+        self._specs.append((block.name, shape, dtype.str))
+        return np.ndarray(shape, dtype, buffer=block.buf)
+
+    def _run(self, command: str, seed: int|None = None):
+        if self._group is not None:
+            if command == "reset":
+                self._group.reset(seed)
+            else:
+                self._group.step()
+            return
+        for conn in self._connections:
+            conn.send((command, seed))
+        # Wait for every worker before raising, so none is left with an answer in its pipe
+        errors = [error for error in (conn.recv() for conn in self._connections) if error is not None]
+        if errors:
+            raise errors[0]
+
+    def reset(self, seed: int|None = None) -> tuple[np.ndarray, dict]:
+        """Deal a game in every environment, environment i gets seed + i. Returns (observations, info)"""
+        self._run("reset", seed)
+        return self.observations, self.info
+
+    def step(self, actions) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, dict]:
+        """Play one action in every environment. Returns (observations, rewards, terminated, truncated, info).
+        Environments that terminated on the previous step start a new game instead"""
+        self.actions[:] = actions
+        self._run("step")
+        return self.observations, self.rewards, self.terminated, self.truncated, self.info
+
+    def close(self):
+        for conn, process in zip(self._connections, self._processes):
+            conn.send(("close", None))
+            process.join()
+            conn.close()
+        self._connections, self._processes, self._group = [], [], None
+        self.observations = self.action_masks = self.rewards = self.terminated = self.actions = self.info = None
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+def main():
+    parser = argparse.ArgumentParser(description="Play random legal actions in a vector environment and report its speed")
+    parser.add_argument("--envs", type=int, default=64, help="environments stepped together")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes, 0 steps every game in this process")
+    parser.add_argument("--steps", type=int, default=1000, help="vector steps")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    with GolfVectorEnv(args.envs, args.workers) as env:
+        env.reset(args.seed)
+        games = wins = 0
+        start_time = time.perf_counter()
+        for _ in range(args.steps):
+            # A random legal action for every running game, finished games ignore theirs
+            actions = (rng.random((args.envs, ACTION_COUNT)) * env.action_masks).argmax(axis=1)
+            _obs, _rewards, terminated, _truncated, _info = env.step(actions)
+            games += int(terminated.sum())
+            wins += int((terminated & (env.observations[:, OBS_TABLEAU:OBS_WASTE_TOP] == 0).all(axis=1)).sum())
+        elapsed = time.perf_counter() - start_time
+    print(f"{args.steps * args.envs / elapsed:,.0f} env steps/sec, {games} games ended, {wins} won")
+
+if __name__ == "__main__":
+    main()
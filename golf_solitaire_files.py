@@ -0,0 +1,14 @@
+import os
+
+def write_atomic(path: str, *chunks: bytes, sync: bool = False):
+    """Write chunks to path under a temporary name and rename it into place, so readers never see a
+    half written file. With sync the data is on disk before the rename, which also survives a crash
+    of the machine"""
+    temp = f"{path}.tmp"
+    with open(temp, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+        if sync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(temp, path)
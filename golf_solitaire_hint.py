@@ -0,0 +1,172 @@
+import multiprocessing
+import os
+import random
+import threading
+import time
+from typing import NamedTuple
+from golf_solitaire import CARD_COUNT, STOCK, TABLEAU_COLUMNS, GolfGame, Move
+from golf_solitaire_engine import GolfState
+
+# CONSTANTS
+BUDGET = 0.05 # Seconds a hint may take
+RESULT_MARGIN = 0.005 # Seconds of the budget kept for sending results back from the workers
+
+# Suggested move with its estimated chance of winning
+class Hint(NamedTuple):
+    move: Move
+    win_rate: float
+    playouts: int # Playouts of the suggested move
+
+    def command(self) -> str:
+        """The move as a CLI command"""
+        return "S" if self.move.source == STOCK else f"D {self.move.source + 1}"
+
+def unseen_cards(game: GolfGame) -> bytes:
+    """Cards the player can't see, in index order: those on the face-down stockpile and the one left out of the deal"""
+    seen = bytearray(CARD_COUNT)
+    for pile in (*game.tableau, game.wastepile):
+        for index in pile.indices:
+            seen[index] = 1
+    return bytes(index for index in range(CARD_COUNT) if not seen[index])
+
+def hidden_state(game: GolfGame) -> GolfState:
+    """The position as the player sees it. Nothing of the real stockpile is kept, its place is taken by
+    unseen cards in index order"""
+    state = GolfState.from_game(game)
+    state.stock[:state.stock_size] = unseen_cards(game)[:state.stock_size]
+    return state
+
+def playout(state: GolfState, rng: random.Random) -> int:
+    """Play a position to the end, a random fitting column card first and else the stock.
+    Returns the cards left on the tableau, 0 is a win"""
+    can_play = state.can_play
+    while True:
+        plays = [col for col in range(TABLEAU_COLUMNS) if can_play(col)]
+        if plays:
+            state.play(plays[rng.randrange(len(plays))] if len(plays) > 1 else plays[0])
+        elif state.stock_size:
+            state.hit()
+        else:
+            return state.cards_left()
+
+def run_playouts(task: tuple[GolfState, bytes, list[int], int, int, float]) -> list[tuple[int, int, int]]:
+    """Play each move in turn until the deadline, a time.time() shared by all processes, at least once.
+    Returns (playouts, wins, cards left) for every move"""
+    root, unseen, moves, deal_seed, play_seed, deadline = task
+    # The guessed stockpiles and the choices of the playouts come from generators of their own
+    deal_rng = random.Random(deal_seed)
+    rng = random.Random(play_seed)
+    stock_size = root.stock_size
+    stats = [[0, 0, 0] for _ in moves]
+    while True:
+        for move, move_stats in zip(moves, stats):
+            state = root.copy()
+            # A fresh guess for every playout: any of the unseen cards may be on the stockpile, in any order
+            cards = list(unseen)
+            deal_rng.shuffle(cards)
+            state.stock[:stock_size] = bytes(cards[:stock_size])
+            state.apply(move)
+            left = playout(state, rng)
+            move_stats[0] += 1
+            move_stats[1] += left == 0
+            move_stats[2] += left
+        if time.time() >= deadline:
+            return [tuple(move_stats) for move_stats in stats]
+
+def _ready(_task: int):
+    # Submitted once per worker when the pool starts, so the workers have imported this module before they get a hint
+    return None
+
+# Ranks the legal moves of a game by the win rate of random playouts from them, spread over a
+# process pool. The pool starts in the background with the first hint, which plays in this process
+# meanwhile, so a program that never asks for a hint never starts it
+class HintEngine:
+    def __init__(self, workers: int|None = None, seed: int|None = None):
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.rng = random.Random(seed)
+        self.pool = None # Set once every worker is up
+        self.starter: threading.Thread|None = None
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        self.close()
+
+    def start(self):
+        """Start the worker processes in a background thread, without waiting for them"""
+        with self.lock:
+            if self.starter is None and self.workers > 1:
+                self.starter = threading.Thread(target=self._start_pool, daemon=True)
+                self.starter.start()
+
+    def _start_pool(self):
+        # Spawned, not forked: forking from this thread could copy a lock another thread holds into the workers
+        pool = multiprocessing.get_context("spawn").Pool(self.workers)
+        pool.map(_ready, range(self.workers), chunksize=1)
+        self.pool = pool
+
+    def close(self):
+        with self.lock:
+            if self.starter is not None:
+                self.starter.join()
+                self.starter = None
+            if self.pool is not None:
+                self.pool.terminate()
+                self.pool = None
+
+    def suggest(self, game: GolfGame, budget: float = BUDGET) -> Hint|None:
+        """Best move within budget seconds, None if the game has no moves left"""
+        legal = game.legal_moves()
+        if not legal:
+            return None
+        deadline = time.time() + budget
+        root = hidden_state(game)
+        unseen = unseen_cards(game)
+        moves = [move.source for move in legal]
+        totals = [[0, 0, 0] for _ in moves]
+        results = []
+        if self.pool is None:
+            self.start()
+        else:
+            worker_deadline = deadline - RESULT_MARGIN
+            pending = [self.pool.apply_async(run_playouts, ((root, unseen, moves, self.rng.getrandbits(64), self.rng.getrandbits(64), worker_deadline),)) for _ in range(self.workers)]
+            for result in pending:
+                # Results that miss the deadline are left behind
+                try:
+                    results.append(result.get(max(deadline - time.time(), 0.0)))
+                except multiprocessing.TimeoutError:
+                    pass
+        if not results and time.time() < deadline:
+            # Without workers, or while they start, play here
+            results.append(run_playouts((root, unseen, moves, self.rng.getrandbits(64), self.rng.getrandbits(64), deadline)))
+        if not results:
+            # No worker made it in time and the budget is spent: the first column card that fits, else the stock
+            return Hint(legal[0], 0.0, 0)
+        for stats in results:
+            for total, move_stats in zip(totals, stats):
+                for i, value in enumerate(move_stats):
+                    total[i] += value
+        # Highest win rate, then fewest cards left on average
+        best = max(range(len(moves)), key=lambda i: (totals[i][1] / totals[i][0], -totals[i][2] / totals[i][0]) if totals[i][0] else (-1.0, 0.0))
+        playouts, wins, _left = totals[best]
+        return Hint(legal[best], wins / playouts if playouts else 0.0, playouts)
+
+_engine: HintEngine|None = None
+
+def engine() -> HintEngine:
+    """The engine shared by the whole process"""
+    global _engine
+    if _engine is None:
+        _engine = HintEngine()
+    return _engine
+
+def start():
+    """Start the workers of the shared engine in the background. The first hint does this anyway and
+    plays in its own process meanwhile, so front ends only need it to get pooled playouts from the first hint"""
+    engine().start()
+
+def suggest(game: GolfGame, budget: float = BUDGET) -> Hint|None:
+    """Best move for a game, from the shared engine"""
+    return engine().suggest(game, budget)
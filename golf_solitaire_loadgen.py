@@ -0,0 +1,114 @@
+import argparse
+import asyncio
+import random
+import time
+import tracemalloc
+from typing import Awaitable, Callable
+import golf_solitaire_server
+from golf_solitaire import GolfGame
+from golf_solitaire_server import END_OF_RESPONSE, GAME_BYTES, HOST, MAX_LINE, PORT, GolfServer
+
+# Commands sent by the simulated players, moves are the most common
+COMMAND_MIX = ["S"] * 4 + [f"D {col}" for col in range(1, 8)] * 2 + ["U", "P", "P", "H", "R"]
+
+async def read_response(reader: asyncio.StreamReader) -> list[str]:
+    lines = []
+    while True:
+        line = await reader.readline()
+        if not line:
+            raise ConnectionError("Server closed the connection")
+        text = line.decode("utf-8").rstrip("\n")
+        if text == END_OF_RESPONSE:
+            return lines
+        lines.append(text[1:] if text.startswith("..") else text)
+
+async def run_client(host: str, port: int, commands: int, rng: random.Random, latencies: list[float],
+                     before_exit: Callable[[], Awaitable[None]]|None = None):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(commands):
+            command = rng.choice(COMMAND_MIX)
+            start = time.perf_counter()
+            writer.write(command.encode("utf-8") + b"\n")
+            await writer.drain()
+            await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+        if before_exit is not None:
+            await before_exit()
+        writer.write(b"X\n")
+        await read_response(reader)
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+def server_bytes() -> int:
+    """Bytes traced by tracemalloc that were allocated by the server's code, its games and pending responses"""
+    snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(True, golf_solitaire_server.__file__, all_frames=True)])
+    return sum(stat.size for stat in snapshot.statistics("filename"))
+
+async def run_load(host: str, port: int, clients: int, commands: int, seed: int = 0, local: bool = False,
+                   memory: list[int]|None = None) -> list[float]:
+    """Latency in seconds of every command sent by all clients. With local the server runs in this process,
+    and given a memory list the server's bytes per session are appended to it, measured once every
+    client has sent its commands and before any has left"""
+    listener = None
+    if local:
+        listener = await GolfServer().start(host, 0)
+        port = listener.sockets[0].getsockname()[1]
+    latencies: list[float] = []
+    before_exit = None
+    if memory is not None:
+        # The position hash tables are built with the first game. Dealt here, they aren't charged to the sessions
+        GolfGame(seed=seed)
+        # Allocations are traced with their whole stack, so those made under the server's handlers are found
+        tracemalloc.start(64)
+        waiting = [clients]
+        measured = asyncio.Event()
+        async def measure():
+            waiting[0] -= 1
+            if waiting[0] == 0:
+                memory.append(server_bytes() // clients)
+                tracemalloc.stop()
+                measured.set()
+            await measured.wait()
+        before_exit = measure
+    try:
+        await asyncio.gather(*(run_client(host, port, commands, random.Random(seed + i), latencies, before_exit) for i in range(clients)))
+    finally:
+        if listener is not None:
+            listener.close()
+            await listener.wait_closed()
+    return latencies
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test a Golf Solitaire server with concurrent sessions")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--clients", type=int, default=200, help="concurrent sessions")
+    parser.add_argument("--commands", type=int, default=100, help="commands per session")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--local", action="store_true", help="start a server in this process instead of connecting to one")
+    parser.add_argument("--memory", action="store_true", help="with --local, measure the memory of a session and check it against its budget")
+    args = parser.parse_args()
+    if args.memory and not args.local:
+        parser.error("--memory needs --local, the server has to run in this process")
+
+    memory = [] if args.memory else None
+    start = time.perf_counter()
+    latencies = asyncio.run(run_load(args.host, args.port, args.clients, args.commands, args.seed, args.local, memory))
+    elapsed = time.perf_counter() - start
+    print(f"{len(latencies)} commands from {args.clients} sessions in {elapsed:.2f}s ({len(latencies) / elapsed:,.0f} commands/sec)")
+    print(f"latency p50 {percentile(latencies, 0.50) * 1000:.2f} ms, p99 {percentile(latencies, 0.99) * 1000:.2f} ms")
+    if memory:
+        # Stream buffers are capped by the transport, the rest of a session's budget is its game and one line
+        budget = GAME_BYTES + MAX_LINE
+        print(f"server memory {memory[0]:,} bytes per session, budget {budget:,} bytes besides the stream buffers")
+        if memory[0] > budget:
+            raise SystemExit("Sessions use more memory than their budget")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import cProfile
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+from golf_solitaire import GolfGame, Redo
+from golf_solitaire_files import write_atomic
+
+# Operations that are counted and timed once enabled, as (class, method, metric name)
+INSTRUMENTED = [
+    (GolfGame, "place_on_wastepile", "move"),
+    (GolfGame, "try_draw_card", "try_draw_card"),
+    (GolfGame, "draw_from_wastepile", "draw_from_wastepile"),
+    (GolfGame, "apply", "apply"),
+    (GolfGame, "undo", "undo"),
+    (GolfGame, "redo", "redo"),
+    (GolfGame, "legal_moves", "legal_moves"),
+    (GolfGame, "check_game_state", "check_game_state"),
+    (GolfGame, "draw_self", "draw_self"),
+]
+RECORDED = ["frame"] # Operations timed with record() by code outside the game classes
+EXPORT_INTERVAL = 10.0
+
+# Call counts and cumulative seconds per operation, plus the size of the undo journals.
+# Disabled, the game classes are left untouched, so there is no overhead at all: enabling
+# swaps timing wrappers in for the instrumented methods and disabling puts the originals back.
+# Games run on more than one thread (server executors, the exporter reads from its own), so the
+# counters are only changed and read under a lock
+class Metrics:
+    def __init__(self):
+        self.operations: dict[str, list] = {} # Name: [calls, seconds]
+        self.lock = threading.Lock()
+        self.journal_adds = 0
+        self.journal_max = 0 # Most entries seen in one Redo journal
+        self.started = time.time()
+        self._originals: list[tuple[type, str, Callable]] = []
+
+    @property
+    def enabled(self) -> bool:
+        return len(self._originals) > 0
+
+    def enable(self):
+        if self.enabled:
+            return
+        # Every operation gets its counters up front, so the exporter never sees the dict grow
+        with self.lock:
+            for name in [name for _cls, _method, name in INSTRUMENTED] + RECORDED:
+                self.operations.setdefault(name, [0, 0.0])
+        for cls, method, name in INSTRUMENTED:
+            original = cls.__dict__[method]
+            self._originals.append((cls, method, original))
+            setattr(cls, method, self._timed(name, original))
+        original_add = Redo.__dict__["add"]
+        self._originals.append((Redo, "add", original_add))
+        setattr(Redo, "add", self._journal_add(original_add))
+
+    def disable(self):
+        for cls, method, original in reversed(self._originals):
+            setattr(cls, method, original)
+        self._originals.clear()
+
+    def reset(self):
+        # In place, the installed wrappers hold on to these lists
+        with self.lock:
+            for stats in self.operations.values():
+                stats[0] = 0
+                stats[1] = 0.0
+            self.journal_adds = 0
+            self.journal_max = 0
+            self.started = time.time()
+
+    def record(self, name: str, seconds: float):
+        """Add one timed call, for code outside the game classes such as the pygame frame loop"""
+        with self.lock:
+            stats = self.operations.setdefault(name, [0, 0.0])
+            stats[0] += 1
+            stats[1] += seconds
+
+    def _timed(self, name: str, func: Callable) -> Callable:
+        stats = self.operations[name]
+        lock = self.lock
+        perf_counter = time.perf_counter
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                seconds = perf_counter() - start
+                with lock:
+                    stats[0] += 1
+                    stats[1] += seconds
+        return timed
+
+    def _journal_add(self, func: Callable) -> Callable:
+        @functools.wraps(func)
+        def add(journal: Redo, *args, **kwargs):
+            func(journal, *args, **kwargs)
+            with self.lock:
+                self.journal_adds += 1
+                if len(journal) > self.journal_max:
+                    self.journal_max = len(journal)
+        return add
+
+    def snapshot(self) -> dict:
+        # Copied under the lock, then formatted without holding it
+        with self.lock:
+            operations = [(name, calls, seconds) for name, (calls, seconds) in self.operations.items()]
+            journal = {"adds": self.journal_adds, "max_entries": self.journal_max}
+            started = self.started
+        return {
+            "timestamp": time.time(),
+            "uptime": time.time() - started,
+            "operations": {
+                name: {"calls": calls, "seconds": seconds, "mean_us": seconds / calls * 1e6 if calls else 0.0}
+                for name, calls, seconds in operations
+            },
+            "journal": journal,
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format, for the node exporter's textfile collector"""
+        snapshot = self.snapshot()
+        operations = snapshot["operations"]
+        journal = snapshot["journal"]
+        lines = [
+            "# HELP golf_operation_calls_total Calls of an instrumented operation",
+            "# TYPE golf_operation_calls_total counter",
+        ]
+        lines += [f'golf_operation_calls_total{{op="{name}"}} {stats["calls"]}' for name, stats in operations.items()]
+        lines += [
+            "# HELP golf_operation_seconds_total Time spent in an instrumented operation",
+            "# TYPE golf_operation_seconds_total counter",
+        ]
+        lines += [f'golf_operation_seconds_total{{op="{name}"}} {stats["seconds"]:.9f}' for name, stats in operations.items()]
+        lines += [
+            "# HELP golf_journal_adds_total Entries added to undo journals",
+            "# TYPE golf_journal_adds_total counter",
+            f"golf_journal_adds_total {journal['adds']}",
+            "# HELP golf_journal_max_entries Most entries seen in one undo journal",
+            "# TYPE golf_journal_max_entries gauge",
+            f"golf_journal_max_entries {journal['max_entries']}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        """Write a snapshot, as Prometheus text if path ends in .prom and as JSON otherwise"""
+        text = self.to_prometheus() if path.endswith(".prom") else self.to_json()
+        write_atomic(path, text.encode("utf-8"))
+
+# Writes a snapshot every interval seconds from a daemon thread, and a last one when stopped
+class MetricsExporter:
+    def __init__(self, metrics: Metrics, path: str, interval: float = EXPORT_INTERVAL):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="metrics-exporter", daemon=True)
+
+    def start(self) -> MetricsExporter:
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+        self.metrics.write(self.path)
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            self.metrics.write(self.path)
+
+METRICS = Metrics()
+
+def enable(path: str|None = None, interval: float = EXPORT_INTERVAL) -> MetricsExporter|None:
+    """Turn on the shared metrics, exporting them to path every interval seconds if given"""
+    METRICS.enable()
+    if path is None:
+        return None
+    return MetricsExporter(METRICS, path, interval).start()
+
+@contextmanager
+def profile_moves(moves: int, path: str|None = None) -> Iterator[cProfile.Profile]:
+    """Profile the block with cProfile until the given number of moves has been made in any game.
+    The stats are written to path when given, for pstats or snakeviz"""
+    profiler = cProfile.Profile()
+    original = GolfGame.__dict__["place_on_wastepile"]
+    made = 0
+    def counted(game: GolfGame, source: int, card):
+        nonlocal made
+        original(game, source, card)
+        made += 1
+        if made == moves:
+            profiler.disable()
+    GolfGame.place_on_wastepile = counted
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        GolfGame.place_on_wastepile = original
+        if path is not None:
+            profiler.dump_stats(path)
@@ -0,0 +1,68 @@
+import random
+from typing import Callable, Dict
+from golf_solitaire import STOCK, TABLEAU_COLUMNS, GolfGame, Move
+from golf_solitaire_engine import GolfState
+
+# A policy picks the next move of a running game, one of game.legal_moves(). It gets a generator of
+# its own for every game, so a seed is played the same way whichever process plays it
+GamePolicy = Callable[[GolfGame, random.Random], Move]
+
+def policy_rng(seed: int) -> random.Random:
+    """Generator for the choices of a policy playing deal seed. Its stream is separate from the one that
+    shuffled the deal, so the choices don't follow the card order"""
+    # A string seed is hashed with SHA-512, the same in every process unlike hash()
+    return random.Random(f"policy {seed}")
+
+# --- POLICIES ---
+
+def greedy_policy(game: GolfGame, _rng: random.Random) -> Move:
+    """First column whose top card fits, else the stock"""
+    return game.legal_moves()[0]
+
+def random_policy(game: GolfGame, rng: random.Random) -> Move:
+    return rng.choice(game.legal_moves())
+
+def run_length(state: GolfState, memo: dict[int, int]) -> int:
+    """Most column cards that can be played one after another from state without drawing"""
+    key = state.key()
+    if key in memo:
+        return memo[key]
+    best = 0
+    for col in range(TABLEAU_COLUMNS):
+        if state.can_play(col):
+            state.play(col)
+            best = max(best, 1 + run_length(state, memo))
+            state.revert(col)
+    memo[key] = best
+    return best
+
+def lookahead_policy(game: GolfGame, _rng: random.Random) -> Move:
+    """The column card that starts the longest run of column plays, else the stock"""
+    legal = game.legal_moves()
+    best, best_run = legal[-1], -1
+    # The search runs on a compact copy of the position, the game itself is left alone
+    state = GolfState.from_game(game)
+    memo: dict[int, int] = {}
+    for move in legal:
+        if move.source == STOCK:
+            continue
+        state.play(move.source)
+        run = run_length(state, memo)
+        state.revert(move.source)
+        if run > best_run:
+            best, best_run = move, run
+    return best
+
+policies: Dict[str, GamePolicy] = {
+    "greedy": greedy_policy,
+    "lookahead": lookahead_policy,
+    "random": random_policy,
+}
+
+def play_game(game: GolfGame, policy: GamePolicy, rng: random.Random) -> str:
+    """Play a game to the end with a policy, returns the result of check_game_state"""
+    result = game.check_game_state()
+    while result == "running":
+        game.apply(policy(game, rng))
+        result = game.check_game_state()
+    return result
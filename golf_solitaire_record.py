@@ -0,0 +1,162 @@
+import argparse
+import mmap
+import random
+import struct
+from typing import Iterator
+from golf_solitaire import CARD_COUNT, SHUFFLE_VERSION, STOCK, GolfGame
+
+# --- RECORD FILE ---
+# A 4 byte magic followed by one variable-size record per game:
+#   kind (1 byte), the deal, the number of moves (1 byte), one byte per move (column 0-6 or STOCK)
+# The deal is either the 52 card indices in CardDeck order (KIND_DEAL) or the version of the shuffle
+# (1 byte) and a 64-bit seed (KIND_SEED). Shuffle version 1 is how GolfGame(seed=seed) deals:
+# random.Random(seed).shuffle of the deck in index order.
+# Files with the GSG1 magic are from before the version byte, their seeds are all version 1.
+RECORD_MAGIC = b"GSG2"
+RECORD_MAGIC_V1 = b"GSG1"
+KIND_DEAL = 0
+KIND_SEED = 1
+SEED = struct.Struct("<Q")
+MAX_MOVES = 255
+
+# One recorded game
+class GameRecord:
+    __slots__ = ("seed", "deal", "moves", "shuffle")
+
+    def __init__(self, moves: bytes, seed: int|None = None, deal: bytes|None = None, shuffle: int = SHUFFLE_VERSION):
+        if (seed is None) == (deal is None):
+            raise ValueError("A record needs either a seed or a deal")
+        self.seed = seed
+        self.deal = deal
+        self.moves = moves
+        self.shuffle = shuffle # Version of the shuffle that dealt the seed
+
+    def __repr__(self):
+        dealt = f"seed={self.seed}" if self.seed is not None else f"deal={self.deal.hex()}"
+        return f"GameRecord({dealt}, moves={len(self.moves)})"
+
+    @classmethod
+    def from_game(cls, game: GolfGame) -> GameRecord:
+        """Record the moves made in a game so far, undone moves are left out"""
+        moves = bytes(source for source, _card, _moves in game.movestack.done)
+        if len(moves) != game.moves:
+            raise ValueError("The move history of this game was trimmed, it can't be recorded")
+        if game.seed is not None and 0 <= game.seed < 2**64:
+            return cls(moves, seed=game.seed)
+        return cls(moves, deal=game.deal)
+
+    def deck(self) -> bytes:
+        """Card indices in CardDeck order, the last one is dealt first"""
+        if self.deal is not None:
+            return self.deal
+        if self.shuffle != SHUFFLE_VERSION:
+            raise ValueError(f"Seed {self.seed} was dealt by shuffle version {self.shuffle}, this version deals {SHUFFLE_VERSION}")
+        cards = list(range(CARD_COUNT))
+        random.Random(self.seed).shuffle(cards)
+        return bytes(cards)
+
+    def game(self, move: int|None = None) -> GolfGame:
+        """Rebuild the game after the first move moves, or after all of them"""
+        game = GolfGame(deck=self.deck())
+        replay(game, self.moves[:move])
+        return game
+
+    def encode(self) -> bytes:
+        if len(self.moves) > MAX_MOVES:
+            raise ValueError(f"A record holds at most {MAX_MOVES} moves")
+        if self.seed is not None:
+            head = bytes((KIND_SEED, self.shuffle)) + SEED.pack(self.seed)
+        else:
+            head = bytes((KIND_DEAL,)) + self.deal
+        return head + bytes((len(self.moves),)) + self.moves
+
+def replay(game: GolfGame, moves: bytes):
+    """Play recorded moves (column 0-6 or STOCK) on a game"""
+    for source in moves:
+        for move in game.legal_moves():
+            if move.source == source:
+                game.apply(move)
+                break
+        else:
+            raise ValueError(f"Recorded move {'S' if source == STOCK else f'D{source + 1}'} is not legal after {game.moves} moves")
+
+# Appends records to a file, writing the magic when the file is new
+class RecordWriter:
+    def __init__(self, path: str):
+        self.file = open(path, "ab", buffering=1 << 20)
+        if self.file.tell() == 0:
+            self.file.write(RECORD_MAGIC)
+        else:
+            with open(path, "rb") as f:
+                if f.read(len(RECORD_MAGIC)) != RECORD_MAGIC:
+                    self.file.close()
+                    raise ValueError(f"{path} is not a game record file of this version, records can't be added to it")
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        self.close()
+
+    def write(self, record: GameRecord):
+        self.file.write(record.encode())
+        self.count += 1
+
+    def write_game(self, game: GolfGame):
+        self.write(GameRecord.from_game(game))
+
+    def close(self):
+        self.file.close()
+
+def read_records(path: str) -> Iterator[GameRecord]:
+    """Iterate over the records of a file lazily, through a memory map"""
+    with open(path, "rb") as f:
+        magic = f.read(len(RECORD_MAGIC))
+        if magic not in (RECORD_MAGIC, RECORD_MAGIC_V1):
+            raise ValueError(f"{path} is not a game record file")
+        # Seed records of version 1 files have no shuffle version byte
+        version_size = 1 if magic == RECORD_MAGIC else 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            end = len(data)
+            pos = len(RECORD_MAGIC)
+            while pos < end:
+                kind = data[pos]
+                if kind not in (KIND_SEED, KIND_DEAL):
+                    raise ValueError(f"{path}: unknown record kind {kind} at byte {pos}")
+                # Kind, deal and move count have to be there before they can be read
+                if pos + 2 + (version_size + SEED.size if kind == KIND_SEED else CARD_COUNT) > end:
+                    raise ValueError(f"{path}: truncated record at the end of the file")
+                shuffle = 1 # All seeds of version 1 files
+                if kind == KIND_SEED:
+                    if version_size:
+                        shuffle = data[pos + 1]
+                    seed, deal = SEED.unpack_from(data, pos + 1 + version_size)[0], None
+                    pos += 1 + version_size + SEED.size
+                else:
+                    seed, deal = None, data[pos + 1:pos + 1 + CARD_COUNT]
+                    pos += 1 + CARD_COUNT
+                count = data[pos]
+                moves = data[pos + 1:pos + 1 + count]
+                pos += 1 + count
+                if pos > end:
+                    raise ValueError(f"{path}: truncated record at the end of the file")
+                yield GameRecord(moves, seed, deal, shuffle)
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a Golf Solitaire game record file")
+    parser.add_argument("path", help="record file")
+    parser.add_argument("--show", type=int, default=None, help="print the final position of this record")
+    args = parser.parse_args()
+
+    games = moves = 0
+    for i, record in enumerate(read_records(args.path)):
+        games += 1
+        moves += len(record.moves)
+        if i == args.show:
+            print(record)
+            print(record.game().draw_self())
+    print(f"{games} games, {moves} moves, {moves / max(games, 1):.1f} moves/game")
+
+if __name__ == "__main__":
+    main()
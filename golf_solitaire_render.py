@@ -0,0 +1,131 @@
+import os
+import sys
+from typing import TextIO
+from golf_solitaire import CARD_COUNT, CARD_FACES, CARD_VALUES, CARD_WIDTH, FACE_MAPPING, LINE_SEP, TABLEAU_COLUMNS, GolfGame
+
+# --- GLYPHS ---
+# Every card cell is pre-rendered once, board lines are joined from these strings
+BLANK = " " * CARD_WIDTH + LINE_SEP
+BORDER = "+---+" + LINE_SEP
+HIDDEN = "|***|" + LINE_SEP
+CARD_GLYPHS: tuple[str, ...] = tuple(
+    f"|{(CARD_VALUES[card % len(CARD_VALUES)] + FACE_MAPPING[CARD_FACES[card // len(CARD_VALUES)]]).ljust(CARD_WIDTH - 2)}|" + LINE_SEP
+    for card in range(CARD_COUNT)
+)
+HEADER = [
+    "-" * 7 * 6,
+    LINE_SEP.join(f" |{col + 1}| " for col in range(TABLEAU_COLUMNS)),
+]
+PILES_HEADER = "--S-- --W--"
+
+# ANSI escape sequences
+CLEAR_SCREEN = "\x1b[H\x1b[2J"
+CLEAR_LINE_END = "\x1b[K"
+CLEAR_BELOW = "\x1b[J"
+
+def board_lines(game: GolfGame) -> list[str]:
+    """The board of GolfGame.draw_self as a list of lines, built from the glyph cache"""
+    lines = [f"Score:{game.moves}  Stock:{len(game.stockpile)}", *HEADER]
+    columns = [col.indices for col in game.tableau]
+    max_len = max(len(cards) for cards in columns)
+    for i in range(max_len):
+        lines.append("".join(BORDER if cards and i <= len(cards) else BLANK for cards in columns))
+        lines.append("".join(CARD_GLYPHS[cards[i]] if i < len(cards) else BLANK for cards in columns))
+    lines.append("".join(BORDER if max_len > 0 and max_len <= len(cards) else BLANK for cards in columns))
+    lines.append("")
+    lines.append(PILES_HEADER)
+
+    stockTop = game.stockpile.peek_card()
+    wasteTop = game.wastepile.peek_card()
+    stockBorder, stockFace = (BLANK, BLANK) if stockTop is None else (BORDER, HIDDEN)
+    wasteBorder, wasteFace = (BLANK, BLANK) if wasteTop is None else (BORDER, CARD_GLYPHS[wasteTop.index])
+    # The waste pile is the last cell of its line, without a trailing separator
+    lines.append(stockBorder + wasteBorder[:-len(LINE_SEP)])
+    lines.append(stockFace + wasteFace[:-len(LINE_SEP)])
+    lines.append(stockBorder + wasteBorder[:-len(LINE_SEP)])
+    return lines
+
+# Redraws a frame of text lines in place. The previous frame is kept and only the cells that changed
+# are written, using relative cursor moves so it keeps working after the terminal scrolled.
+# Falls back to plain printing when the output is not a terminal.
+class TerminalRenderer:
+    def __init__(self, out: TextIO = sys.stdout):
+        self.out = out
+        self.ansi = out.isatty()
+        self.previous: list[str]|None = None
+        self.row = 0 # Cursor position relative to the first line of the frame
+        self.col = 0
+        self.bytes_written = 0
+        if self.ansi and os.name == 'nt':
+            os.system('') # Switches the Windows console to ANSI escape sequences, once
+        # Imported here, shutil pulls in the compression modules and scripts never render to a terminal
+        import shutil
+        self.terminal_size = shutil.get_terminal_size
+
+    def invalidate(self):
+        """Draw the whole screen again on the next render"""
+        self.previous = None
+
+    def render(self, lines: list[str]) -> int:
+        """Show the frame and leave the cursor on the line below it. Returns the number of characters written"""
+        if not self.ansi:
+            out = "\n".join(lines) + "\n"
+        elif self.previous is None or max(len(lines), len(self.previous)) >= self.terminal_size().lines:
+            # Rows that scrolled off the screen can't be reached with cursor moves
+            out = CLEAR_SCREEN + "\n".join(lines) + "\n"
+        else:
+            out = self._diff(self.previous, lines)
+        self.previous = list(lines)
+        self.row = len(lines)
+        self.col = 0
+        self.out.write(out)
+        self.out.flush()
+        self.bytes_written += len(out)
+        return len(out)
+
+    def read_line(self, prompt: str = "") -> str:
+        line = input(prompt)
+        if self.previous is not None:
+            # The typed text was echoed below the frame, it is cleared by the next render
+            self.previous.append(prompt + line)
+            self.row += 1
+        return line
+
+    def _move_to(self, parts: list[str], row: int, col: int):
+        if row < self.row:
+            parts.append(f"\x1b[{self.row - row}A")
+        elif row > self.row:
+            # Line feeds also scroll the terminal when the frame grows past the bottom
+            parts.append("\n" * (row - self.row))
+            self.col = 0
+        if col != self.col:
+            parts.append("\r" if col == 0 else f"\x1b[{col + 1}G")
+        self.row = row
+        self.col = col
+
+    def _diff(self, old: list[str], new: list[str]) -> str:
+        parts: list[str] = []
+        for row, line in enumerate(new):
+            before = old[row] if row < len(old) else ""
+            if line == before:
+                continue
+            start = 0
+            end = min(len(line), len(before))
+            while start < end and line[start] == before[start]:
+                start += 1
+            if len(line) == len(before):
+                while line[end - 1] == before[end - 1]:
+                    end -= 1
+                self._move_to(parts, row, start)
+                parts.append(line[start:end])
+                self.col = end
+            else:
+                self._move_to(parts, row, start)
+                parts.append(line[start:])
+                if len(line) < len(before):
+                    parts.append(CLEAR_LINE_END)
+                self.col = len(line)
+        self._move_to(parts, len(new), 0)
+        if len(old) > len(new):
+            parts.append(CLEAR_BELOW)
+        return "".join(parts)
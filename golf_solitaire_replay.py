@@ -0,0 +1,101 @@
+import argparse
+import itertools
+from typing import Iterator
+from golf_solitaire import CARDS, STOCK, TABLEAU_COLUMNS, GolfGame
+from golf_solitaire_engine import GolfState
+from golf_solitaire_record import GameRecord, read_records
+from golf_solitaire_render import TerminalRenderer, board_lines
+
+# CONSTANTS
+CHECKPOINT_INTERVAL = 16
+
+# Rebuilds any position of a recorded game. The moves are checked and played once on the integer
+# engine, which keeps a copy of the state every CHECKPOINT_INTERVAL moves, so seeking to a move
+# replays at most CHECKPOINT_INTERVAL - 1 moves from the checkpoint before it.
+class Replay:
+    def __init__(self, deck: bytes, moves: bytes, interval: int = CHECKPOINT_INTERVAL):
+        self.deck = bytes(deck)
+        self.moves = bytes(moves)
+        self.interval = interval
+        state = GolfState.from_deck(self.deck)
+        self.checkpoints: list[GolfState] = [state.copy()]
+        for i, move in enumerate(self.moves):
+            legal = state.stock_size > 0 if move == STOCK else move < TABLEAU_COLUMNS and state.can_play(move)
+            if not legal:
+                raise ValueError(f"Recorded move {i + 1} ({move}) is not legal")
+            state.apply(move)
+            if (i + 1) % interval == 0:
+                self.checkpoints.append(state.copy())
+
+    @classmethod
+    def from_record(cls, record: GameRecord, interval: int = CHECKPOINT_INTERVAL) -> Replay:
+        return cls(record.deck(), record.moves, interval)
+
+    # Number of moves, positions are numbered 0 (the deal) to len(replay)
+    def __len__(self):
+        return len(self.moves)
+
+    def state_at(self, move: int) -> GolfState:
+        """The position after the first move moves, as a new GolfState"""
+        if not 0 <= move <= len(self.moves):
+            raise IndexError(f"Move {move} is outside the replay (0-{len(self.moves)})")
+        checkpoint = move // self.interval
+        state = self.checkpoints[checkpoint].copy()
+        for source in self.moves[checkpoint * self.interval:move]:
+            state.apply(source)
+        return state
+
+    def positions(self, start: int = 0) -> Iterator[GolfState]:
+        """Every position from move start to the end. This is one state advanced in place, copy it to keep it"""
+        state = self.state_at(start)
+        yield state
+        for source in self.moves[start:]:
+            state.apply(source)
+            yield state
+
+    def game_at(self, move: int) -> GolfGame:
+        """The position after the first move moves as a GolfGame, with those moves in its undo history"""
+        state = self.state_at(move)
+        game = GolfGame(deck=self.deck)
+        for col, pile in enumerate(game.tableau):
+            pile.set_cards(state.column(col))
+        game.stockpile.set_cards(state.stock[:state.stock_size])
+        game.wastepile.set_cards(state.waste[:state.waste_size])
+        for i, source in enumerate(self.moves[:move]):
+            # The waste holds the dealt card followed by one card per move
+            game.movestack.add(source, CARDS[state.waste[i + 1]], i)
+        game.moves = move
+        game.refresh()
+        return game
+
+def main():
+    parser = argparse.ArgumentParser(description="Step through a recorded Golf Solitaire game in the terminal")
+    parser.add_argument("path", help="record file")
+    parser.add_argument("--record", type=int, default=0, help="index of the game in the file")
+    args = parser.parse_args()
+
+    record = next(itertools.islice(read_records(args.path), args.record, None), None)
+    if record is None:
+        parser.error(f"{args.path} has no record {args.record}")
+    replay = Replay.from_record(record)
+    renderer = TerminalRenderer()
+    move = 0
+    message = ""
+    while True:
+        footer = [f"Move {move}/{len(replay)}", message, "", "Enter/N: next  P: previous  G [n]: go to move  Q: quit"]
+        renderer.render(board_lines(replay.game_at(move)) + footer)
+        command = renderer.read_line().strip().upper()
+        message = ""
+        if command in ("", "N"):
+            move = min(move + 1, len(replay))
+        elif command == "P":
+            move = max(move - 1, 0)
+        elif command.startswith("G") and command[1:].strip().isdigit():
+            move = min(int(command[1:]), len(replay))
+        elif command == "Q":
+            break
+        else:
+            message = f"❌ ERROR: Invalid command format: '{command}'"
+
+if __name__ == "__main__":
+    main()
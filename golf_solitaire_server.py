@@ -0,0 +1,148 @@
+import argparse
+import asyncio
+from contextlib import suppress
+import golf_solitaire_metrics
+from golf_solitaire_commands import GameSession, handle_parse, pattern
+from golf_solitaire_render import board_lines
+
+# --- PROTOCOL ---
+# Clients send one command per line, with the grammar of the CLI (D n, S, U, Y, R, T, H, X) plus P to
+# print the board. Every command gets a response of zero or more lines ended by a line holding a
+# single ".", lines of the response that start with "." get an extra "." in front.
+END_OF_RESPONSE = "."
+SERVER_COMMANDS = ["P:       Print the board"]
+
+# CONSTANTS
+HOST = "127.0.0.1"
+PORT = 7777
+MAX_LINE = 256 # Longest command line read into memory, longer lines close the session
+IDLE_TIMEOUT = 300.0
+MAX_SESSIONS = 10_000
+# Memory a session may hold: its game, its read buffer and the responses the client has not read yet
+SESSION_MEMORY = 64 * 1024
+# A GolfGame with a full move journal, a game ends after at most 50 moves. Measured at about 5 KiB
+# on average and 6 KiB at most, golf_solitaire_loadgen.py --local --memory checks it
+GAME_BYTES = 8 * 1024
+
+def frame(text: str) -> bytes:
+    lines = ["." + line if line.startswith(".") else line for line in text.split("\n")]
+    lines.append(END_OF_RESPONSE)
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+# Hosts one GameSession per connection
+class GolfServer:
+    def __init__(self, idle_timeout: float = IDLE_TIMEOUT, max_sessions: int = MAX_SESSIONS, session_memory: int = SESSION_MEMORY):
+        # Output that may wait for a slow client, the session is paused once that is buffered
+        self.write_buffer = session_memory - GAME_BYTES - MAX_LINE
+        if self.write_buffer < 4 * 1024:
+            raise ValueError(f"A session needs at least {GAME_BYTES + MAX_LINE + 4 * 1024} bytes")
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        # Open connections with their session and the loop time of their last command
+        self.sessions: dict[asyncio.StreamWriter, tuple[GameSession, float]] = {}
+        self.evicted = 0
+        self.evictor: asyncio.Task|None = None
+
+    async def start(self, host: str = HOST, port: int = PORT) -> asyncio.Server:
+        if self.evictor is None:
+            self.evictor = asyncio.get_running_loop().create_task(self.evict_idle())
+        return await asyncio.start_server(self.handle_client, host, port, limit=MAX_LINE, backlog=1024)
+
+    # One task sweeps all sessions, instead of a timeout on every read. This also closes clients
+    # that stopped reading their responses, since they send no commands either
+    async def evict_idle(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(min(self.idle_timeout / 4, 5.0))
+            cutoff = loop.time() - self.idle_timeout
+            for writer, (_session, last_active) in list(self.sessions.items()):
+                if last_active < cutoff:
+                    self.evicted += 1
+                    del self.sessions[writer]
+                    writer.write(frame(f"Session closed after {self.idle_timeout:g} seconds without commands"))
+                    writer.close()
+
+    @staticmethod
+    def is_slow(line: str) -> bool:
+        """Commands that run too long for the event loop: a hint takes its whole budget"""
+        match = pattern.match(line.strip())
+        return match is not None and match.group(8) is not None
+
+    def respond(self, session: GameSession, line: str) -> str:
+        command = line.strip().upper()
+        if command == "P":
+            return "\n".join(board_lines(session.game))
+        response = handle_parse(session, line)
+        if command == "H":
+            response += "\n" + "\n".join(SERVER_COMMANDS)
+        if session.state != "exit":
+            session.state = session.game.check_game_state()
+            if session.state == "win":
+                response += "\nYou've won! Press (R) to play again"
+            elif session.state == "lose":
+                response += "\nYou've lost! Press (R) to play again"
+        return response
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        if len(self.sessions) >= self.max_sessions:
+            writer.write(frame("❌ ERROR: Server is full, try again later"))
+            writer.close()
+            return
+        writer.transport.set_write_buffer_limits(high=self.write_buffer)
+        loop = asyncio.get_running_loop()
+        session = GameSession()
+        self.sessions[writer] = (session, loop.time())
+        try:
+            while session.state != "exit":
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    writer.write(frame(f"❌ ERROR: Commands are at most {MAX_LINE} bytes"))
+                    break
+                if not line or writer not in self.sessions:
+                    break
+                self.sessions[writer] = (session, loop.time())
+                text = line.decode("utf-8", "replace")
+                if self.is_slow(text):
+                    # Runs in a thread, the other sessions are served meanwhile
+                    response = await loop.run_in_executor(None, self.respond, session, text)
+                else:
+                    response = self.respond(session, text)
+                writer.write(frame(response))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions.pop(writer, None)
+            writer.close()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+async def serve(server: GolfServer, host: str, port: int):
+    listener = await server.start(host, port)
+    addresses = ", ".join(str(sock.getsockname()) for sock in listener.sockets)
+    print(f"Serving Golf Solitaire on {addresses}")
+    async with listener:
+        await listener.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Host Golf Solitaire sessions over TCP, one game per connection")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT, help="seconds before an idle session is closed")
+    parser.add_argument("--max-sessions", type=int, default=MAX_SESSIONS)
+    parser.add_argument("--session-memory", type=int, default=SESSION_MEMORY, help="bytes a session may buffer")
+    parser.add_argument("--metrics", metavar="PATH", help="record game metrics and write them to PATH (.prom for Prometheus text, else JSON)")
+    args = parser.parse_args()
+
+    exporter = golf_solitaire_metrics.enable(args.metrics) if args.metrics else None
+    server = GolfServer(args.idle_timeout, args.max_sessions, args.session_memory)
+    try:
+        with suppress(KeyboardInterrupt):
+            asyncio.run(serve(server, args.host, args.port))
+    finally:
+        if exporter is not None:
+            exporter.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import argparse
+import multiprocessing
+import os
+import random
+import struct
+import time
+from typing import Callable, Dict, Iterator
+from golf_solitaire import STOCK, TABLEAU_COLUMNS
+from golf_solitaire_engine import GolfState
+from golf_solitaire_policy import policy_rng
+
+# --- RESULT FILE ---
+# A 4 byte magic followed by one fixed-size record per deal: seed, won, moves, cards left on the tableau
+RESULT_MAGIC = b"GSR1"
+RESULT_RECORD = struct.Struct("<QBBB")
+
+PolicyFunc = Callable[[GolfState, random.Random], int]
+
+# --- POLICIES ---
+# A policy picks the next move (a column 0-6 or STOCK) for a running game
+
+def greedy_policy(state: GolfState, _rng: random.Random) -> int:
+    for col in range(TABLEAU_COLUMNS):
+        if state.can_play(col):
+            return col
+    return STOCK
+
+def random_policy(state: GolfState, rng: random.Random) -> int:
+    return rng.choice(state.legal_moves())
+
+policies: Dict[str, PolicyFunc] = {
+    "greedy": greedy_policy,
+    "random": random_policy,
+}
+
+# --- SIMULATION ---
+
+def play_deal(seed: int, policy: PolicyFunc) -> tuple[int, bool, int, int]:
+    state = GolfState.from_seed(seed)
+    # The policy gets its own generator so results do not depend on which worker plays the deal
+    rng = policy_rng(seed)
+    result = state.check_game_state()
+    while result == "running":
+        state.apply(policy(state, rng))
+        result = state.check_game_state()
+    return seed, result == "win", state.moves, state.cards_left()
+
+def play_chunk(task: tuple[int, int, str]) -> bytes:
+    start, stop, policy_name = task
+    policy = policies[policy_name]
+    out = bytearray()
+    for seed in range(start, stop):
+        out += RESULT_RECORD.pack(*play_deal(seed, policy))
+    return bytes(out)
+
+def simulate(start: int, count: int, policy_name: str, path: str, workers: int|None = None, chunk_size: int = 1000) -> tuple[int, int]:
+    """Play seeds start..start+count-1 and write their results to path in seed order. Returns (deals, wins)"""
+    if policy_name not in policies:
+        raise ValueError(f"Unknown policy '{policy_name}', choose from {', '.join(policies)}")
+    tasks = [(seed, min(seed + chunk_size, start + count), policy_name) for seed in range(start, start + count, chunk_size)]
+    deals = wins = 0
+    with open(path, "wb") as out, multiprocessing.Pool(workers) as pool:
+        out.write(RESULT_MAGIC)
+        for chunk in pool.imap(play_chunk, tasks):
+            out.write(chunk)
+            for _seed, won, _moves, _left in RESULT_RECORD.iter_unpack(chunk):
+                deals += 1
+                wins += won
+    return deals, wins
+
+def read_results(path: str) -> Iterator[tuple[int, bool, int, int]]:
+    with open(path, "rb") as f:
+        if f.read(len(RESULT_MAGIC)) != RESULT_MAGIC:
+            raise ValueError(f"{path} is not a simulation result file")
+        while True:
+            data = f.read(RESULT_RECORD.size * 4096)
+            if not data:
+                return
+            if len(data) % RESULT_RECORD.size:
+                raise ValueError(f"{path}: truncated record at the end of the file")
+            for seed, won, moves, left in RESULT_RECORD.iter_unpack(data):
+                yield seed, bool(won), moves, left
+
+def main():
+    parser = argparse.ArgumentParser(description="Play seeded Golf Solitaire deals headless across all cores")
+    parser.add_argument("--start", type=int, default=0, help="first seed")
+    parser.add_argument("--count", type=int, default=100_000, help="number of deals")
+    parser.add_argument("--policy", choices=sorted(policies), default="greedy")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="deals per worker task")
+    parser.add_argument("--out", default="results.bin", help="result file")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    deals, wins = simulate(args.start, args.count, args.policy, args.out, args.workers, args.chunk_size)
+    elapsed = time.perf_counter() - start_time
+    print(f"{deals} deals, {wins} won ({wins / max(deals, 1):.2%}), {deals / elapsed:,.0f} deals/sec on {args.workers} workers")
+
+if __name__ == "__main__":
+    main()
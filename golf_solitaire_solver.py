@@ -0,0 +1,156 @@
+import argparse
+import time
+from golf_solitaire import ADJACENT, CARD_COUNT, CARD_VALUES, COLUMN_DEPTH, STOCK, TABLEAU_COLUMNS, GolfGame
+from golf_solitaire_engine import GolfState
+
+# CONSTANTS
+RANKS = bytes(card % len(CARD_VALUES) for card in range(CARD_COUNT))
+# Bit offset of each column height in the packed heights key, 3 bits per column
+COLUMN_SHIFT = tuple(3 * (TABLEAU_COLUMNS - 1 - col) for col in range(TABLEAU_COLUMNS))
+# A node takes about 2 us in CPython. Half of the seeded deals are decided within 30k nodes (about
+# 50 ms), but one in ten needs over 400k and the hardest, mostly unwinnable ones, over a million.
+# Finding the shortest line costs about 10 times more. The command line gives up on a deal at
+MAX_NODES = 1_000_000
+
+# Outcome of solving one position
+class SolveResult:
+    def __init__(self, winnable: bool|None, line: list[int], nodes: int, seconds: float, dead_ends: int = 0):
+        self.winnable = winnable # None if the node limit was hit first
+        self.line = line # Winning sequence of moves (columns 0-6 or STOCK), empty if not winnable
+        self.nodes = nodes
+        self.seconds = seconds
+        self.dead_ends = dead_ends # Lost positions (empty stock, no column fits) the search ran into
+
+    def __repr__(self):
+        return f"SolveResult(winnable={self.winnable}, moves={len(self.line)}, nodes={self.nodes}, nodes/sec={self.nodes_per_second:,.0f})"
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.seconds if self.seconds > 0 else 0.0
+
+class NodeLimitReached(Exception):
+    pass
+
+# Depth-first solver over the move graph of one deal (tableau column -> waste, stock -> waste)
+class Solver:
+    def __init__(self, max_nodes: int|None = None):
+        # Transposition table keyed by column heights and waste top rank. The value is the most cards
+        # left on the stock with which the position is known to be lost: with fewer it is lost as well,
+        # since any win from there also works with extra stock cards by drawing one more card.
+        self.lost: dict[int, int] = {}
+        self.tables: dict[int, dict[int, int]] = {} # Lost tables of the searches of one solve, by floor
+        self.max_nodes = max_nodes
+        self.nodes = 0
+        self.dead_ends = 0
+        self.line: list[int] = [] # Built backwards while a win returns up the search
+        self.floor = 0 # Stock cards that may not be drawn, used to bound the number of draws
+
+    def solve(self, state: GolfState, shortest: bool = False) -> SolveResult:
+        """Decide if the position can be won. With shortest the returned line uses the fewest moves,
+        found by searching again with fewer stock draws allowed, which costs a few times more nodes"""
+        self.nodes = 0
+        self.dead_ends = 0
+        start = time.perf_counter()
+        line: list[int] = []
+        self.tables.clear()
+        try:
+            winnable = self._search_with_floor(state, 0)
+            if winnable:
+                line = self.line[::-1]
+            if winnable and shortest:
+                # Every column card has to be played, so fewer moves means fewer stock draws. A position
+                # won with some draws can be won with more allowed, so the fewest are found by bisection
+                low, high = 0, line.count(STOCK)
+                while low < high:
+                    draws = (low + high) // 2
+                    if self._search_with_floor(state, state.stock_size - draws):
+                        line = self.line[::-1]
+                        high = line.count(STOCK)
+                    else:
+                        low = draws + 1
+        except NodeLimitReached:
+            return SolveResult(None, [], self.nodes, time.perf_counter() - start, self.dead_ends)
+        finally:
+            self.tables.clear()
+        return SolveResult(winnable, line, self.nodes, time.perf_counter() - start, self.dead_ends)
+
+    def _search_with_floor(self, state: GolfState, floor: int) -> bool:
+        # Only the heights change during the search, the waste top and stock size are passed down
+        state = state.copy()
+        heights_key = 0
+        for col in range(TABLEAU_COLUMNS):
+            heights_key |= state.heights[col] << COLUMN_SHIFT[col]
+        # Positions lost with more draws allowed are lost with fewer too, so the search starts from
+        # the table of the search with the highest floor not above this one
+        known = [lower for lower in self.tables if lower <= floor]
+        self.lost = dict(self.tables[max(known)]) if known else {}
+        self.tables[floor] = self.lost
+        self.line = []
+        self.floor = floor
+        return self._search(state, heights_key, state.waste[state.waste_size - 1], state.stock_size)
+
+    def _search(self, state: GolfState, heights_key: int, top: int, stock_size: int) -> bool:
+        key = (heights_key << 4) | RANKS[top]
+        if self.lost.get(key, -1) >= stock_size:
+            return False
+        if heights_key == 0:
+            return True
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise NodeLimitReached()
+
+        heights = state.heights
+        tableau = state.tableau
+        fits = ADJACENT[top]
+        moved = False
+        for col in range(TABLEAU_COLUMNS):
+            height = heights[col]
+            if height:
+                card = tableau[col * COLUMN_DEPTH + height - 1]
+                if fits[card]:
+                    moved = True
+                    heights[col] = height - 1
+                    if self._search(state, heights_key - (1 << COLUMN_SHIFT[col]), card, stock_size):
+                        self.line.append(col)
+                        return True
+                    heights[col] = height
+        if stock_size > self.floor:
+            if self._search(state, heights_key, state.stock[stock_size - 1], stock_size - 1):
+                self.line.append(STOCK)
+                return True
+        elif stock_size == 0 and not moved:
+            self.dead_ends += 1
+        self.lost[key] = stock_size
+        return False
+
+def solve_game(game: GolfGame, shortest: bool = False) -> SolveResult:
+    return Solver().solve(GolfState.from_game(game), shortest)
+
+def format_line(line: list[int]) -> str:
+    """Write a line of moves as CLI commands"""
+    return " ".join("S" if move == STOCK else f"D{move + 1}" for move in line)
+
+def main():
+    parser = argparse.ArgumentParser(description="Decide whether seeded Golf Solitaire deals can be won")
+    parser.add_argument("--start", type=int, default=0, help="first seed")
+    parser.add_argument("--count", type=int, default=100, help="number of deals")
+    parser.add_argument("--shortest", action="store_true", help="find the shortest winning line")
+    parser.add_argument("--max-nodes", type=int, default=MAX_NODES, help="give up on a deal after this many nodes, 0 for no limit")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print the winning line of every deal")
+    args = parser.parse_args()
+
+    solver = Solver(args.max_nodes or None)
+    wins = unknown = nodes = 0
+    seconds = 0.0
+    for seed in range(args.start, args.start + args.count):
+        result = solver.solve(GolfState.from_seed(seed), args.shortest)
+        wins += result.winnable is True
+        unknown += result.winnable is None
+        nodes += result.nodes
+        seconds += result.seconds
+        if args.verbose:
+            print(f"{seed}: {result!r} {format_line(result.line)}")
+    print(f"{wins}/{args.count} deals winnable ({unknown} unknown), {nodes / max(seconds, 1e-9):,.0f} nodes/sec, {seconds / max(args.count, 1) * 1000:.2f} ms/deal")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+import argparse
+import os
+import re
+import secrets
+import time
+from typing import Sequence
+from golf_solitaire import CARD_COUNT, STOCK, Card, GolfGame
+from golf_solitaire_commands import GameSession
+from golf_solitaire_files import write_atomic
+
+# --- JOURNAL FILE ---
+# One file per session, a 4 byte magic followed by records that are only ever appended:
+#   a move (1 byte, column 0-6 or STOCK), UNDO, REDO, or DEAL followed by the 52 card indices of a
+#   new game in CardDeck order
+# A journal starts with a DEAL. Replaying it stops at the first record that is cut off or doesn't fit
+# the game, which is where a crash left the file, and that tail is cut off before anything is appended.
+JOURNAL_MAGIC = b"GSJ1"
+JOURNAL_SUFFIX = ".gsj"
+UNDO = STOCK + 1
+REDO = STOCK + 2
+DEAL = STOCK + 3
+SESSION_ID = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+SYNC_INTERVAL = 1.0 # Seconds between fsyncs of the journals written to
+COMPACT_SIZE = 1024 # Journals are compacted once larger than this and twice their compacted size
+
+# GolfGame that writes every move, undo and redo to the journal of its session
+class JournaledGame(GolfGame):
+    def __init__(self, seed: int|None = None, max_history: int|None = None, deck: Sequence[int]|None = None):
+        super().__init__(seed, max_history, deck)
+        self.journal: Journal|None = None # Not set while the game is replayed from its journal
+        # Sources of the moves played and of those undone, unlike the undo history these are never trimmed
+        self.played = bytearray()
+        self.redoable = bytearray()
+
+    def place_on_wastepile(self, source: int, card: Card):
+        super().place_on_wastepile(source, card)
+        self.played.append(source)
+        self.redoable.clear()
+        if self.journal is not None:
+            self.journal.write(bytes((source,)))
+
+    def undo(self):
+        depth = len(self.movestack)
+        result = super().undo()
+        if len(self.movestack) < depth:
+            self.redoable.append(self.played.pop())
+            if self.journal is not None:
+                self.journal.write(bytes((UNDO,)))
+        return result
+
+    def redo(self):
+        depth = len(self.movestack)
+        result = super().redo()
+        if len(self.movestack) > depth:
+            self.played.append(self.redoable.pop())
+            if self.journal is not None:
+                self.journal.write(bytes((REDO,)))
+        return result
+
+def replay_record(game: JournaledGame, record: int) -> bool:
+    """Play one journal record that isn't a DEAL, returns False if it doesn't fit the game"""
+    if record == UNDO:
+        if not game.movestack.done:
+            return False
+        game.undo()
+        return True
+    if record == REDO:
+        if not game.movestack.undone:
+            return False
+        game.redo()
+        return True
+    for move in game.legal_moves():
+        if move.source == record:
+            game.apply(move)
+            return True
+    return False
+
+def _sync_directory(directory: str):
+    # Makes a new or renamed file survive a crash, directories can't be opened on Windows
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+# Journal file of one session. Every record is written with its own small write as soon as it is
+# made, so a crash of the process loses nothing. The store batches the fsyncs, which are needed to
+# survive a crash of the machine
+class Journal:
+    def __init__(self, store: SessionStore, path: str):
+        self.store = store
+        self.path = path
+        self.fd: int|None = None
+        self.size = 0 # Bytes of the file, once loaded
+        self.game: JournaledGame|None = None
+
+    def load(self, max_history: int|None = None) -> JournaledGame:
+        """Rebuild the game by replaying the journal"""
+        with open(self.path, "rb") as f:
+            data = f.read()
+        if not data.startswith(JOURNAL_MAGIC):
+            raise ValueError(f"{self.path} is not a session journal")
+        game = None
+        pos = len(JOURNAL_MAGIC)
+        while pos < len(data):
+            record = data[pos]
+            if record == DEAL:
+                deal = data[pos + 1:pos + 1 + CARD_COUNT]
+                if len(deal) < CARD_COUNT or sorted(deal) != list(range(CARD_COUNT)):
+                    break
+                # Replayed without a history limit, only undos that worked were written
+                game = JournaledGame(deck=deal)
+                pos += 1 + CARD_COUNT
+            elif game is not None and replay_record(game, record):
+                pos += 1
+            else:
+                break
+        if game is None:
+            raise ValueError(f"{self.path} holds no deal")
+        history = game.movestack
+        history.max_depth = max_history
+        if max_history is not None and len(history.done) > max_history:
+            del history.done[:len(history.done) - max_history]
+        if pos < len(data):
+            os.truncate(self.path, pos)
+        self.size = pos
+        self.attach(game)
+        return game
+
+    def attach(self, game: JournaledGame):
+        self.game = game
+        game.journal = self
+
+    def write(self, record: bytes):
+        if self.fd is None:
+            self.fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | getattr(os, "O_BINARY", 0))
+        os.write(self.fd, record)
+        self.size += len(record)
+        self.store.written(self)
+
+    def new_game(self, game: JournaledGame):
+        # Attached first, writing may compact the journal down to the current game
+        self.attach(game)
+        self.write(bytes((DEAL,)) + game.deal)
+
+    def compacted(self) -> bytes:
+        """The journal as just the deal and the moves of the current game. Moves that can be redone are
+        played and undone again, so the redo history survives too"""
+        game = self.game
+        # redoable[-1] is the next move to redo
+        redo = bytes(reversed(game.redoable))
+        return JOURNAL_MAGIC + bytes((DEAL,)) + game.deal + bytes(game.played) + redo + bytes((UNDO,)) * len(redo)
+
+    def compact(self):
+        data = self.compacted()
+        # The old file has to be closed before it can be replaced on Windows
+        self.close()
+        write_atomic(self.path, data, sync=True)
+        _sync_directory(os.path.dirname(self.path) or ".")
+        self.size = len(data)
+
+    def sync(self):
+        if self.fd is not None:
+            os.fsync(self.fd)
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+# GameSession kept in a session store. Its game is only read from the journal the first time it is used
+class StoredSession(GameSession):
+    def __init__(self, session_id: str, journal: Journal, max_history: int|None = None):
+        # Not GameSession.__init__, that deals a new game
+        self.session_id = session_id
+        self.journal = journal
+        self.max_history = max_history
+        self.state = "running"
+
+    @property
+    def loaded(self) -> bool:
+        return self.journal.game is not None
+
+    @property
+    def game(self) -> JournaledGame:
+        return self.load()
+
+    def load(self) -> JournaledGame:
+        """Replay the journal unless that was done already"""
+        if self.journal.game is None:
+            self.journal.load(self.max_history)
+        return self.journal.game
+
+    def new_game(self, seed: int|None = None):
+        # The journal is loaded first, so a torn record at its end is cut off before the deal is appended
+        self.load()
+        self.journal.new_game(JournaledGame(seed, self.max_history))
+
+# Sessions saved in a directory, one journal file each. Opening the store only lists the files
+class SessionStore:
+    def __init__(self, directory: str, max_history: int|None = None, sync_interval: float = SYNC_INTERVAL):
+        self.directory = directory
+        self.max_history = max_history
+        self.sync_interval = sync_interval
+        self.unsynced: set[Journal] = set()
+        self.last_sync = time.monotonic()
+        os.makedirs(directory, exist_ok=True)
+        self.sessions: dict[str, StoredSession] = {}
+        for entry in os.scandir(directory):
+            if entry.name.endswith(JOURNAL_SUFFIX):
+                session_id = entry.name[:-len(JOURNAL_SUFFIX)]
+                self.sessions[session_id] = StoredSession(session_id, Journal(self, entry.path), max_history)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def __contains__(self, session_id: str):
+        return session_id in self.sessions
+
+    def __getitem__(self, session_id: str) -> StoredSession:
+        return self.sessions[session_id]
+
+    def create(self, session_id: str|None = None, seed: int|None = None) -> StoredSession:
+        """Start a session with a new game, under a random ID if none is given"""
+        if session_id is None:
+            session_id = secrets.token_hex(8)
+        if not SESSION_ID.fullmatch(session_id):
+            raise ValueError(f"Invalid session ID '{session_id}', use up to 64 letters, digits, - and _")
+        if session_id in self.sessions:
+            raise ValueError(f"Session '{session_id}' already exists")
+        game = JournaledGame(seed, self.max_history)
+        path = os.path.join(self.directory, session_id + JOURNAL_SUFFIX)
+        data = JOURNAL_MAGIC + bytes((DEAL,)) + game.deal
+        write_atomic(path, data, sync=True)
+        _sync_directory(self.directory)
+        journal = Journal(self, path)
+        journal.size = len(data)
+        journal.attach(game)
+        session = self.sessions[session_id] = StoredSession(session_id, journal, self.max_history)
+        return session
+
+    def open(self, session_id: str, seed: int|None = None) -> StoredSession:
+        """The session with this ID, created with a game dealt from seed if there is none"""
+        if session_id in self.sessions:
+            return self.sessions[session_id]
+        return self.create(session_id, seed)
+
+    def remove(self, session_id: str):
+        session = self.sessions.pop(session_id)
+        session.journal.close()
+        self.unsynced.discard(session.journal)
+        os.remove(session.journal.path)
+
+    def unload(self, session_id: str):
+        """Write a session to disk and free its game, it is replayed again when next used"""
+        journal = self.sessions[session_id].journal
+        journal.sync()
+        journal.close()
+        self.unsynced.discard(journal)
+        if journal.game is not None:
+            journal.game.journal = None
+            journal.game = None
+
+    def written(self, journal: Journal):
+        self.unsynced.add(journal)
+        if journal.size > COMPACT_SIZE and journal.size > 2 * len(journal.compacted()):
+            journal.compact()
+            self.unsynced.discard(journal)
+        if time.monotonic() - self.last_sync >= self.sync_interval:
+            self.sync()
+
+    def sync(self):
+        """Fsync every journal written to since the last sync. Writes between syncs survive a crash of
+        the process but not of the machine, so call this from a timer to bound what such a crash loses"""
+        for journal in self.unsynced:
+            journal.sync()
+        self.unsynced.clear()
+        self.last_sync = time.monotonic()
+
+    def compact(self) -> int:
+        """Compact every loaded journal larger than its compacted size, returns how many were compacted"""
+        count = 0
+        for session in self.sessions.values():
+            journal = session.journal
+            if journal.game is not None and journal.size > len(journal.compacted()):
+                journal.compact()
+                self.unsynced.discard(journal)
+                count += 1
+        return count
+
+    def close(self):
+        self.sync()
+        for session in self.sessions.values():
+            session.journal.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="List the Golf Solitaire sessions saved in a directory")
+    parser.add_argument("directory", help="session directory")
+    parser.add_argument("--compact", action="store_true", help="load every session and compact its journal")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    with SessionStore(args.directory) as store:
+        opened = time.perf_counter() - start_time
+        print(f"{len(store)} sessions, listed in {opened * 1000:.1f} ms")
+        if not args.compact:
+            return
+        start_time = time.perf_counter()
+        for session in store.sessions.values():
+            session.load()
+        loaded = time.perf_counter() - start_time
+        compacted = store.compact()
+        print(f"Replayed all sessions in {loaded * 1000:.1f} ms, compacted {compacted} journals")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import argparse
+import math
+import multiprocessing
+import os
+import time
+from statistics import NormalDist
+from typing import Iterator
+from golf_solitaire import GolfGame
+from golf_solitaire_policy import play_game, policies, policy_rng
+
+# CONSTANTS
+ALPHA = 0.05 # Chance of stopping early on a difference that isn't there
+CONFIDENCE = 0.95 # Of the reported intervals
+BATCH_SIZE = 200 # Seeds per worker task, the stopping rule is checked after every batch
+MAX_GAMES = 100_000 # Seeds per policy when no difference shows up
+
+def play_batch(task: tuple[list[str], int, int]) -> list[bytes]:
+    """Play seeds start..stop-1 with every policy, returns one byte per seed (1 for a win) per policy"""
+    names, start, stop = task
+    return [
+        bytes(play_game(GolfGame(seed=seed), policies[name], policy_rng(seed)) == "win" for seed in range(start, stop))
+        for name in names
+    ]
+
+# Results of a tournament so far. All policies play the same seeds, so they are compared seed by seed
+class Standings:
+    def __init__(self, names: list[str]):
+        self.names = names
+        self.games = 0 # Per policy
+        self.wins = [0] * len(names)
+        # beat[a][b]: seeds policy a won and policy b lost
+        self.beat = [[0] * len(names) for _ in names]
+        self.significant = False # The leader is significantly better than every other policy
+        self.stopped_early = False
+
+    def add(self, batch: list[bytes]):
+        self.games += len(batch[0])
+        for a, won_a in enumerate(batch):
+            self.wins[a] += sum(won_a)
+            for b, won_b in enumerate(batch):
+                if a != b:
+                    self.beat[a][b] += sum(x > y for x, y in zip(won_a, won_b))
+
+    def leader(self) -> int:
+        return max(range(len(self.names)), key=lambda i: self.wins[i])
+
+    def win_rate(self, i: int, confidence: float = CONFIDENCE) -> tuple[float, float, float]:
+        """Win rate of policy i with its Wilson score interval"""
+        n = self.games
+        if n == 0:
+            return 0.0, 0.0, 1.0
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        rate = self.wins[i] / n
+        center = (rate + z * z / (2 * n)) / (1 + z * z / n)
+        spread = z * math.sqrt(rate * (1 - rate) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+        return rate, center - spread, center + spread
+
+    def z_score(self, a: int, b: int) -> float:
+        """McNemar's test of policy a against b, on the seeds only one of them won"""
+        ab, ba = self.beat[a][b], self.beat[b][a]
+        return (ab - ba) / math.sqrt(ab + ba) if ab + ba else 0.0
+
+    def difference(self, a: int, b: int, confidence: float = CONFIDENCE) -> tuple[float, float, float]:
+        """How much higher the win rate of policy a is than b's, with its interval from the paired results"""
+        n = self.games
+        ab, ba = self.beat[a][b], self.beat[b][a]
+        diff = (ab - ba) / n
+        spread = NormalDist().inv_cdf(0.5 + confidence / 2) * math.sqrt(max(ab + ba - n * diff * diff, 0.0)) / n
+        return diff, diff - spread, diff + spread
+
+def critical_z(alpha: float, looks: int, comparisons: int) -> float:
+    # Bonferroni over every check of every comparison, so looking after each batch keeps the
+    # overall chance of a false stop below alpha
+    return NormalDist().inv_cdf(1 - alpha / (2 * looks * max(comparisons, 1)))
+
+def batches(names: list[str], start: int, max_games: int, batch_size: int) -> Iterator[tuple[list[str], int, int]]:
+    for first in range(start, start + max_games, batch_size):
+        yield names, first, min(first + batch_size, start + max_games)
+
+def run_tournament(names: list[str], start: int = 0, max_games: int = MAX_GAMES, batch_size: int = BATCH_SIZE,
+                   workers: int|None = None, alpha: float = ALPHA) -> Standings:
+    """Play the policies on seeds from start until the leader is significantly better than every
+    other policy, or until max_games seeds were played"""
+    for name in names:
+        if name not in policies:
+            raise ValueError(f"Unknown policy '{name}', choose from {', '.join(policies)}")
+    if len(names) < 2:
+        raise ValueError("A tournament needs at least two policies")
+    standings = Standings(names)
+    threshold = critical_z(alpha, math.ceil(max_games / batch_size), len(names) - 1)
+    # Batches come back in seed order, so where a tournament stops doesn't depend on the workers
+    with multiprocessing.Pool(workers) as pool:
+        for batch in pool.imap(play_batch, batches(names, start, max_games, batch_size)):
+            standings.add(batch)
+            leader = standings.leader()
+            if all(standings.z_score(leader, other) > threshold for other in range(len(names)) if other != leader):
+                standings.significant = True
+                standings.stopped_early = standings.games < max_games
+                break
+    return standings
+
+def main():
+    parser = argparse.ArgumentParser(description="Play Golf Solitaire policies against each other on the same seeds")
+    parser.add_argument("policies", nargs="*", default=sorted(policies), help=f"policies to compare, from {', '.join(policies)}")
+    parser.add_argument("--start", type=int, default=0, help="first seed")
+    parser.add_argument("--max-games", type=int, default=MAX_GAMES, help="seeds per policy if no difference shows up")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="seeds per worker task")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--alpha", type=float, default=ALPHA, help="chance of stopping on a difference that isn't there")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    try:
+        standings = run_tournament(args.policies, args.start, args.max_games, args.batch_size, args.workers, args.alpha)
+    except ValueError as e:
+        parser.error(str(e))
+    elapsed = time.perf_counter() - start_time
+
+    print(f"{standings.games} seeds per policy in {elapsed:.1f}s on {args.workers} workers")
+    for i, name in enumerate(standings.names):
+        rate, low, high = standings.win_rate(i)
+        print(f"{name:12}{rate:8.2%}  ({low:.2%} - {high:.2%})")
+    leader = standings.leader()
+    for other in range(len(standings.names)):
+        if other != leader:
+            diff, low, high = standings.difference(leader, other)
+            print(f"{standings.names[leader]} - {standings.names[other]}: {diff:+.2%} ({low:+.2%} - {high:+.2%}), z = {standings.z_score(leader, other):.2f}")
+    if standings.significant:
+        stopped = ", stopped early" if standings.stopped_early else ""
+        print(f"{standings.names[leader]} is better than the others (alpha {args.alpha}){stopped}")
+    else:
+        print("No policy is significantly better than all the others, played every seed")
+
+if __name__ == "__main__":
+    main()
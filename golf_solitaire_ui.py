@@ -1,41 +1,31 @@
-import os
-from golf_solitaire import GolfGame, Card, Pile
+import itertools
+import time
+from weakref import WeakSet
+from golf_solitaire import CARDS, STOCK, GolfGame, Card, Move, Pile
+from golf_solitaire_atlas import BACK_INDEX, CardAtlas
 import pygame
+# Replays, metrics and hints are imported when they are used, so they don't slow down the start
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Iterable
+    from golf_solitaire_replay import Replay
 
 # --- CONSTANTS ---
 CARD_WIDTH = 34
 CARD_HEIGHT = 58
-CARD_CACHE = {}
+ATLAS: CardAtlas|None = None
 BACK_IMAGE = None
 DARK_GREEN_COLOR = (4, 93, 29)
+BACKGROUND_COLOR = "green"
+HINT_COLOR = "yellow"
+HINT_WIDTH = 3
 
 # --- UTILITIES ---
-def load_image(path) -> pygame.Surface:
-    """Load image from given path, scaled to card size"""
-    try:
-        # Load the image
-        image = pygame.image.load(path).convert_alpha()
-        # Scale the image to a standard size
-        scaled_image = pygame.transform.scale(image, (CARD_WIDTH, CARD_HEIGHT))
-        return scaled_image
-            
-    except pygame.error as e:
-        print(f"Error loading image for {path}: {e}")
-        # Return a simple red rectangle as a placeholder if image fails to load
-        placeholder = pygame.Surface((CARD_WIDTH, CARD_HEIGHT))
-        placeholder.fill((255, 0, 0)) # Red color
-        return placeholder
-    
-def get_card_image(card: Card):
-    """Retrieves image from cache or loads it if missing."""
-    if card.hidden:
+def get_card_image(card: Card, hidden: bool = False):
+    """Retrieves the card image from the atlas scaled to card size."""
+    if hidden:
         return BACK_IMAGE
-    
-    name = f"card_{card.face}{card.value}.png"
-    if name not in CARD_CACHE:
-        path = os.path.join('Card_Deck_Sprites', name)
-        CARD_CACHE[name] = load_image(path)
-    return CARD_CACHE[name]
+    return ATLAS.image(card.index, (CARD_WIDTH, CARD_HEIGHT))
 
 
 # --- MODELS ---
@@ -64,7 +54,7 @@ class PileObject:
         self.pile = pile
 
     def is_colliding(self, cord: pygame.Vector2) -> bool:
-        return self.x <= cord.x < self.x + CARD_WIDTH and self.y <= cord.y < self.y + (CARD_HEIGHT * len(self.pile.cards))
+        return self.x <= cord.x < self.x + CARD_WIDTH and self.y <= cord.y < self.y + (CARD_HEIGHT * len(self.pile))
     
 class GameObject:
     def __init__(self, golf_game: GolfGame):
@@ -74,6 +64,9 @@ class GameObject:
 # --- VIEWS ---
 
 class GameView:
+    # The window was uncovered, its contents may be gone
+    EVENT_TYPES = (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE)
+
     def __init__(self, model: GameObject):
         self.model = model
         # Initialize views for tableau, stockpile, wastepile
@@ -83,18 +76,68 @@ class GameView:
 
         self.wastepile = WastePileView(model.golf_game.wastepile, x=100, y = 300)
 
-    def draw(self, screen):
-        ## draw tableau
-        for i, pile in enumerate(self.tableau):
-            pile.draw(screen, active_card=game_model.active_card)
-        # draw stockpile
-        self.stockpile.draw(screen=screen)
-
-        # draw wastepile
-        self.wastepile.draw(screen=screen)
+        self.piles: list[PileView] = [*self.tableau, self.stockpile, self.wastepile]
+        self.card_rect: pygame.Rect|None = None # Where the dragged card was drawn last frame
+        # Pile outlined by a hint, until the position changes
+        self.hint: PileView|None = None
+        self.hint_position: int|None = None
+        self.hint_rect: pygame.Rect|None = None # Where the outline was drawn last frame
+        self.full_redraw = True
+
+    def set_game(self, golf_game: GolfGame):
+        """Show another game in the same views, used to step through replays"""
+        self.model.golf_game = golf_game
+        self.model.active_card = None
+        piles = [*golf_game.tableau, golf_game.stockpile, golf_game.wastepile]
+        for view, pile in zip(self.piles, piles):
+            view.model = pile
+            view.surface = None
+        self.hint = None
+        self.full_redraw = True
 
-        if game_model.active_card != None:
-            CardView.draw(screen, game_model.active_card)
+    def notify(self, event: pygame.Event):
+        self.full_redraw = True
+
+    def show_hint(self, move: Move):
+        self.hint = self.stockpile if move.source == STOCK else self.tableau[move.source]
+        self.hint_position = self.model.golf_game.position_hash
+
+    def draw(self, screen) -> list[pygame.Rect]:
+        """Redraw what changed since the last frame, returns the dirty rectangles for pygame.display.update"""
+        active_card = self.model.active_card
+        dirty = [pile.area for pile in self.piles if pile.update(active_card)]
+
+        card_rect = None
+        if active_card is not None:
+            card_rect = pygame.Rect(active_card.x, active_card.y, CARD_WIDTH, CARD_HEIGHT)
+        if card_rect != self.card_rect:
+            dirty += [rect for rect in (self.card_rect, card_rect) if rect is not None]
+            self.card_rect = card_rect
+
+        if self.hint is not None and self.model.golf_game.position_hash != self.hint_position:
+            self.hint = None
+        hint_rect = self.hint.area.inflate(2 * HINT_WIDTH, 2 * HINT_WIDTH) if self.hint is not None else None
+        if hint_rect != self.hint_rect:
+            dirty += [rect for rect in (self.hint_rect, hint_rect) if rect is not None]
+            self.hint_rect = hint_rect
+
+        if self.full_redraw:
+            self.full_redraw = False
+            dirty = [screen.get_rect()]
+
+        # Rebuild each dirty rectangle from the background, the cached piles and the dragged card
+        for rect in dirty:
+            screen.set_clip(rect)
+            screen.fill(BACKGROUND_COLOR)
+            for pile in self.piles:
+                if pile.area.colliderect(rect):
+                    pile.draw(screen)
+            if hint_rect is not None and hint_rect.colliderect(rect):
+                pygame.draw.rect(screen, HINT_COLOR, hint_rect, HINT_WIDTH)
+            if active_card is not None and card_rect.colliderect(rect):
+                CardView.draw(screen, active_card)
+        screen.set_clip(None)
+        return dirty
 
 class PileView:
     def __init__(self, model: Pile, x, y, spacing=20):
@@ -104,43 +147,68 @@ class PileView:
         self.spacing = spacing
         # For simplicity, we will just represent the pile as a rectangle
         self.rect = pygame.Rect(self.x, self.y, CARD_WIDTH, CARD_HEIGHT * 5 // 2)
-        
-    def draw(self, screen, active_card: CardObject|None = None):
+        # Pre-composited pile, rebuilt when the pile or the card dragged out of it changes
+        self.surface: pygame.Surface|None = None
+        self.surface_key = None
+
+    # Screen area covered by the cached surface
+    @property
+    def area(self) -> pygame.Rect:
+        return self.rect
+
+    def update(self, active_card: CardObject|None = None) -> bool:
+        """Rebuild the cached surface if the pile changed, returns whether it did"""
+        dragged = active_card.card if active_card is not None and active_card.card.index in self.model.indices else None
+        key = (self.model.version, dragged)
+        if self.surface is not None and key == self.surface_key:
+            return False
+        self.surface_key = key
+        self.surface = self.render(dragged)
+        return True
+
+    def render(self, dragged: Card|None) -> pygame.Surface:
+        surface = pygame.Surface(self.area.size)
         # Draw the surface
-        pygame.draw.rect(screen, DARK_GREEN_COLOR, self.rect)
+        surface.fill(DARK_GREEN_COLOR)
         # Draw the cards
         for i, card in enumerate(self.model.cards):
-            if active_card is None or not active_card.card == card:
-                card_x = self.x
-                card_y = self.y + (i * self.spacing)
-                img = get_card_image(card)
-                screen.blit(img, (card_x, card_y))
+            if card is not dragged:
+                surface.blit(get_card_image(card, self.model.hidden), (0, i * self.spacing))
+        return surface
+
+    def draw(self, screen):
+        screen.blit(self.surface, self.area)
 
 class StockPileView(PileView):
     def __init__(self, model: Pile, x, y):
         super().__init__(model=model, x=x, y=y, spacing=10)
-        self.rect = pygame.Rect(self.x, self.y, CARD_WIDTH * len(self.model.cards) // 2, CARD_HEIGHT)
+        self.rect = pygame.Rect(self.x, self.y, CARD_WIDTH * len(self.model) // 2, CARD_HEIGHT)
 
-    def draw(self, screen, active_card=None):
+    def render(self, dragged=None) -> pygame.Surface:
+        surface = pygame.Surface(self.area.size)
         # Draw the surface
-        pygame.draw.rect(screen, DARK_GREEN_COLOR, self.rect)
+        surface.fill(DARK_GREEN_COLOR)
         # Draw the cards
-        for i, card in enumerate(self.model.cards):
-            if active_card != card:
-                card_x = self.x + (i * self.spacing)
-                card_y = self.y
-                screen.blit(BACK_IMAGE, (card_x, card_y))
+        for i in range(len(self.model)):
+            surface.blit(BACK_IMAGE, (i * self.spacing, 0))
+        return surface
 
 class WastePileView(PileView):
     def __init__(self, pile: Pile, x, y) -> None:
         super().__init__(pile, x, y, spacing=0)
 
-    def draw(self, screen, active_card=None):
-        if self.model.cards:
-            top_card = self.model.cards[-1]
-            if not (active_card and top_card == active_card):
-                img = get_card_image(top_card)
-                screen.blit(img, (self.x, self.y))
+    # Only the top card is shown, on the table background
+    @property
+    def area(self) -> pygame.Rect:
+        return pygame.Rect(self.x, self.y, CARD_WIDTH, CARD_HEIGHT)
+
+    def render(self, dragged=None) -> pygame.Surface:
+        surface = pygame.Surface(self.area.size)
+        surface.fill(BACKGROUND_COLOR)
+        topCard = self.model.peek_card()
+        if topCard is not None:
+            surface.blit(get_card_image(topCard), (0, 0))
+        return surface
 
 class CardView:
     @staticmethod
@@ -150,38 +218,55 @@ class CardView:
 
 # --- CONTROLLERS ---
 class GameController:
+    EVENT_TYPES = (pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION, pygame.MOUSEBUTTONUP, pygame.KEYDOWN)
+
     def __init__(self, game: GameObject, view: GameView,):
         self.golf_game: GameObject = game
         self.game_view = view
+        self.handlers = {
+            pygame.MOUSEBUTTONDOWN: self.on_select,
+            pygame.MOUSEMOTION: self.on_drag,
+            pygame.MOUSEBUTTONUP: self.on_release,
+            pygame.KEYDOWN: self.on_key,
+        }
+        # Mouse motion only matters while a card is dragged, without it moving the mouse over an
+        # idle window doesn't wake the main loop
+        pygame.event.set_blocked(pygame.MOUSEMOTION)
 
     def notify(self, event: pygame.Event):
-        mouse_pos = pygame.Vector2(pygame.mouse.get_pos())
+        self.handlers[event.type](event)
 
-        # Check select
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            print("selecting")
-            self.handle_pickup(mouse_pos)
-        
-        # Check drag
-        if event.type == pygame.MOUSEMOTION and self.golf_game.active_card != None:
-            print("dragging")
-            self.golf_game.active_card.x = mouse_pos.x - (CARD_WIDTH // 2)
-            self.golf_game.active_card.y = mouse_pos.y - (CARD_HEIGHT // 2)
-        # Check release
-        if event.type == pygame.MOUSEBUTTONUP and self.golf_game.active_card != None:
-            print("releasing")
-            self.handle_drop(mouse_pos)
+    def on_select(self, event: pygame.Event):
+        self.handle_pickup(pygame.Vector2(event.pos))
+
+    def on_drag(self, event: pygame.Event):
+        if self.golf_game.active_card is not None:
+            self.golf_game.active_card.x = event.pos[0] - (CARD_WIDTH // 2)
+            self.golf_game.active_card.y = event.pos[1] - (CARD_HEIGHT // 2)
+
+    def on_release(self, event: pygame.Event):
+        if self.golf_game.active_card is not None:
+            self.handle_drop(pygame.Vector2(event.pos))
+
+    # Hint, the T command of the CLI
+    def on_key(self, event: pygame.Event):
+        if event.key == pygame.K_t:
+            import golf_solitaire_hint
+            hint = golf_solitaire_hint.suggest(self.golf_game.golf_game)
+            if hint is not None:
+                self.game_view.show_hint(hint.move)
 
     def handle_pickup(self, pos: pygame.Vector2):
         # Draw from pile
         for pile_view in self.game_view.tableau:
             rect = pile_view.rect
             if rect.collidepoint(pos):
-                rect_y = (rect.y + ((len(pile_view.model.cards)-1) * 20))
-                card = pile_view.model.cards[-1]
+                rect_y = (rect.y + ((len(pile_view.model)-1) * 20))
+                card = CARDS[pile_view.model.indices[-1]]
                 # Initialize CardObject at the exact position it was in the pile
                 self.golf_game.active_card = CardObject(card, rect.x, rect_y)
                 self.origin_pile = pile_view.model
+                pygame.event.set_allowed(pygame.MOUSEMOTION)
                 return
         # Draw from stock
         rect = self.game_view.stockpile.rect
@@ -194,12 +279,40 @@ class GameController:
         active_card = self.golf_game.active_card
 
         if waste_rect.collidepoint(pos) and active_card is not None:
-            succes = self.golf_game.golf_game.try_put_on_wastepile(active_card.card)
-            if succes and self.origin_pile is not None:
-                _ = self.origin_pile.draw_card()
+            # Takes the card off its origin pile when the move is allowed
+            _ = self.golf_game.golf_game.try_put_on_wastepile(active_card.card)
         
         self.golf_game.active_card = None
         self.origin_pile = None
+        pygame.event.set_blocked(pygame.MOUSEMOTION)
+
+# Steps through a recorded game with the arrow keys, page up/down jump a checkpoint interval
+class ReplayController:
+    EVENT_TYPES = (pygame.KEYDOWN,)
+
+    def __init__(self, replay: Replay, view: GameView):
+        self.replay = replay
+        self.game_view = view
+        self.move = 0
+        view.set_game(replay.game_at(0))
+
+    def notify(self, event: pygame.Event):
+        steps = {
+            pygame.K_RIGHT: 1,
+            pygame.K_LEFT: -1,
+            pygame.K_PAGEDOWN: self.replay.interval,
+            pygame.K_PAGEUP: -self.replay.interval,
+            pygame.K_HOME: -len(self.replay),
+            pygame.K_END: len(self.replay),
+        }
+        if event.key in steps:
+            self.seek(self.move + steps[event.key])
+
+    def seek(self, move: int):
+        move = max(0, min(move, len(self.replay)))
+        if move != self.move:
+            self.move = move
+            self.game_view.set_game(self.replay.game_at(move))
 
 class Event:
     """this is a superclass for any events that might be generated by an
@@ -209,68 +322,102 @@ class Event:
 
 class EventManager:
     """this object is responsible for coordinating most communication
-    between the Model, View, and Controller."""
-    def __init__(self ):
-        from weakref import WeakKeyDictionary
-        self.listeners = WeakKeyDictionary()
-
-    def RegisterListener( self, listener ):
-        self.listeners[ listener ] = 1
-
-    def UnregisterListener( self, listener ):
-        if listener in self.listeners.keys():
-            del self.listeners[ listener ]
-
-    def Post( self, event ):
-        for listener in self.listeners.keys():
-            #NOTE: If the weakref has died, it will be 
-            #automatically removed, so we don't have 
-            #to worry about it.
-            listener.notify( event )
-
-def controller_tick(event_manager: EventManager):
-    global running
-    #Handle Input Events
-    for event in pygame.event.get():
+    between the Model, View, and Controller. Listeners subscribe to event
+    types and only get the events of those types."""
+    def __init__(self):
+        self.listeners: dict[int, WeakSet] = {}
+
+    def RegisterListener(self, listener, event_types: Iterable[int]|None = None):
+        """Subscribe to event_types, or else to the listener's EVENT_TYPES"""
+        for event_type in listener.EVENT_TYPES if event_types is None else event_types:
+            self.listeners.setdefault(event_type, WeakSet()).add(listener)
+
+    def UnregisterListener(self, listener):
+        for listeners in self.listeners.values():
+            listeners.discard(listener)
+
+    def Post(self, event):
+        #NOTE: If the weakref has died, it will be
+        #automatically removed, so we don't have
+        #to worry about it.
+        for listener in self.listeners.get(event.type, ()):
+            listener.notify(event)
+
+def controller_tick(event_manager: EventManager, events: list[pygame.Event]) -> bool:
+    """Handle a batch of input events, returns False once the window was closed. Of a run of mouse
+    motion events only the last one is handled, the card follows the latest position"""
+    for i, event in enumerate(events):
         if event.type == pygame.QUIT:
-            running = False
-            return 0
+            return False
+        if event.type == pygame.MOUSEMOTION and i + 1 < len(events) and events[i + 1].type == pygame.MOUSEMOTION:
+            continue
         event_manager.Post(event=event)
-    return 1
+    return True
 
 def view_tick():
     pass
 
 # --- MAIN LOOP ---
-pygame.init()
-screen = pygame.display.set_mode((1280, 720))
-clock = pygame.time.Clock()
-BACK_IMAGE = load_image(os.path.join('Card_Deck_Sprites', "card_back.png"))
-running = True
-
-# --- INITIALIZE MVC COMPONENTS ---
-event_manager = EventManager()
-game_model: GameObject = GameObject(GolfGame())
-game_viewer: GameView = GameView(game_model)
-game_controller: GameController = GameController(game_model, game_viewer)
-event_manager.RegisterListener(game_controller)
-
-while running:
-
-    # handle input
-    controller_tick(event_manager)
-
-    # fill the screen with a color to wipe away anything from last frame
-    screen.fill("green")
-
-    # RENDER YOUR GAME HERE
-    view_tick()
-    # card_viewer.draw(screen=screen)
-    game_viewer.draw(screen=screen)
-
-    # flip() the display to put your work on screen
-    pygame.display.flip()
-
-    clock.tick(60)  # limits FPS to 60
-
-pygame.quit()
\ No newline at end of file
+def main(argv: list[str]|None = None):
+    global ATLAS, BACK_IMAGE
+    import argparse
+    parser = argparse.ArgumentParser(description="Play Golf Solitaire with pygame")
+    parser.add_argument("--replay", metavar="PATH", help="step through a game from a record file instead of playing")
+    parser.add_argument("--record", type=int, default=0, help="index of the replayed game in the file")
+    parser.add_argument("--metrics", metavar="PATH", help="record game and frame metrics and write them to PATH (.prom for Prometheus text, else JSON)")
+    args = parser.parse_args(argv)
+    exporter = None
+    if args.metrics:
+        import golf_solitaire_metrics
+        exporter = golf_solitaire_metrics.enable(args.metrics)
+
+    pygame.init()
+    screen = pygame.display.set_mode((1280, 720))
+    clock = pygame.time.Clock()
+    # Decode all card sprites once, before the first frame
+    ATLAS = CardAtlas.load()
+    BACK_IMAGE = ATLAS.image(BACK_INDEX, (CARD_WIDTH, CARD_HEIGHT))
+
+    # --- INITIALIZE MVC COMPONENTS ---
+    event_manager = EventManager()
+    game_model: GameObject = GameObject(GolfGame())
+    game_viewer: GameView = GameView(game_model)
+    if args.replay is None:
+        game_controller = GameController(game_model, game_viewer)
+    else:
+        from golf_solitaire_record import read_records
+        from golf_solitaire_replay import Replay
+        record = next(itertools.islice(read_records(args.replay), args.record, None))
+        game_controller = ReplayController(Replay.from_record(record), game_viewer)
+    event_manager.RegisterListener(game_controller)
+    event_manager.RegisterListener(game_viewer)
+
+    # Frames are only drawn when there were events, an idle window sleeps in pygame.event.wait
+    frame_start = time.perf_counter()
+    events = pygame.event.get()
+    while controller_tick(event_manager, events):
+        # RENDER YOUR GAME HERE
+        view_tick()
+        # card_viewer.draw(screen=screen)
+        dirty = game_viewer.draw(screen=screen)
+
+        # Only send the parts of the screen that changed to the display
+        if dirty:
+            pygame.display.update(dirty)
+
+        if exporter is not None:
+            # Time spent on the frame, without the waits for events and the next tick
+            golf_solitaire_metrics.METRICS.record("frame", time.perf_counter() - frame_start)
+
+        clock.tick(60)  # limits FPS to 60 while events keep coming
+        # Sleep until something happens, then take everything that queued up meanwhile
+        events = [pygame.event.wait()]
+        frame_start = time.perf_counter()
+        events += pygame.event.get()
+
+    pygame.quit()
+    if exporter is not None:
+        exporter.stop()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,138 @@
+import random
+import pytest
+from golf_solitaire import CARD_COUNT, DEAL_COUNT, STOCK, CardDeck, GolfGame, rank_deal, unrank_deal
+from golf_solitaire_engine import GolfState
+
+SEEDS = range(50)
+STEPS = 200
+
+# --- POSITION HASH ---
+
+def random_step(game: GolfGame, rng: random.Random):
+    """One random move, undo, redo or try_put_on_wastepile, whether or not it is allowed"""
+    action = rng.randrange(5)
+    if action == 0:
+        game.undo()
+    elif action == 1:
+        game.redo()
+    elif action == 2:
+        card = game.tableau[rng.randrange(len(game.tableau))].peek_card()
+        if card is not None:
+            game.try_put_on_wastepile(card)
+    elif action == 3:
+        game.try_draw_card(rng.randrange(len(game.tableau)))
+    else:
+        legal = game.legal_moves()
+        if legal:
+            game.apply(rng.choice(legal))
+
+def test_position_hash_matches_full_hash():
+    for seed in SEEDS:
+        game = GolfGame(seed=seed)
+        rng = random.Random(seed)
+        assert game.position_hash == game.compute_position_hash()
+        for step in range(STEPS):
+            random_step(game, rng)
+            assert game.position_hash == game.compute_position_hash(), (seed, step)
+
+def test_position_hash_matches_full_hash_with_short_history():
+    for seed in SEEDS:
+        game = GolfGame(seed=seed, max_history=3)
+        rng = random.Random(seed)
+        for step in range(STEPS):
+            random_step(game, rng)
+            assert game.position_hash == game.compute_position_hash(), (seed, step)
+
+def test_position_hash_returns_after_undo():
+    game = GolfGame(seed=7)
+    start = game.position_hash
+    game.apply(next(move for move in game.legal_moves() if move.source == STOCK))
+    assert game.position_hash != start
+    game.undo()
+    assert game.position_hash == start
+
+def test_arrange_deals_card_indices_on_a_shuffled_deck():
+    order = GolfGame(seed=5).deal
+    deck = CardDeck()
+    deck.shuffle(6)
+    deck.arrange(order)
+    assert bytes(card.index for card in deck.cards) == order
+
+def test_position_hash_same_for_same_deal():
+    assert GolfGame(seed=3).position_hash == GolfGame(deck=GolfGame(seed=3).deal).position_hash
+    assert GolfGame(seed=3).position_hash != GolfGame(seed=4).position_hash
+
+# --- LEGAL MOVES ---
+
+def probed_moves(game: GolfGame) -> list[tuple[int, int]]:
+    """Legal moves as (source, card index), found by checking every column and the stockpile"""
+    moves = []
+    topCard = game.wastepile.peek_card()
+    for col, pile in enumerate(game.tableau):
+        card = pile.peek_card()
+        if card is not None and topCard is not None and topCard.can_place_on_top(card):
+            moves.append((col, card.index))
+    stockTop = game.stockpile.peek_card()
+    if stockTop is not None:
+        moves.append((STOCK, stockTop.index))
+    return moves
+
+def test_legal_moves_match_probing_every_column():
+    for seed in SEEDS:
+        game = GolfGame(seed=seed)
+        rng = random.Random(seed)
+        for step in range(STEPS):
+            assert [(move.source, move.card.index) for move in game.legal_moves()] == probed_moves(game), (seed, step)
+            random_step(game, rng)
+
+def test_legal_moves_cannot_be_changed_by_callers():
+    game = GolfGame(seed=0)
+    legal = game.legal_moves()
+    assert isinstance(legal, tuple)
+    assert game.legal_moves() is legal
+    with pytest.raises(AttributeError):
+        legal.append(legal[0])
+
+def test_apply_rejects_illegal_moves():
+    game = GolfGame(seed=0)
+    legal = game.legal_moves()
+    game.apply(legal[-1])
+    # The card drawn from the stockpile isn't on it any more
+    with pytest.raises(ValueError):
+        game.apply(legal[-1])
+
+# --- DEAL IDS ---
+
+def test_rank_deal_inverts_unrank_deal():
+    rng = random.Random(0)
+    for deal_id in [0, 1, DEAL_COUNT - 1] + [rng.randrange(DEAL_COUNT) for _ in range(1000)]:
+        order = unrank_deal(deal_id)
+        assert sorted(order) == list(range(CARD_COUNT)), deal_id
+        assert rank_deal(order) == deal_id
+
+def test_unrank_deal_inverts_rank_deal():
+    rng = random.Random(1)
+    for _ in range(1000):
+        order = list(range(CARD_COUNT))
+        rng.shuffle(order)
+        assert list(unrank_deal(rank_deal(order))) == order
+
+def test_deal_ids_out_of_range_are_rejected():
+    for deal_id in (-1, DEAL_COUNT):
+        with pytest.raises(ValueError):
+            unrank_deal(deal_id)
+    with pytest.raises(ValueError):
+        rank_deal([0] * CARD_COUNT)
+
+def test_game_from_deal_id_round_trips():
+    rng = random.Random(2)
+    for deal_id in [0, DEAL_COUNT - 1] + [rng.randrange(DEAL_COUNT) for _ in range(100)]:
+        game = GolfGame.from_deal_id(deal_id)
+        assert game.deal_id == deal_id
+        assert GolfGame(deck=game.deal).deal_id == deal_id
+        assert repr(GolfState.from_deal_id(deal_id)) == repr(GolfState.from_game(game))
+
+def test_seeded_game_has_a_deal_id():
+    for seed in SEEDS:
+        game = GolfGame(seed=seed)
+        assert GolfGame.from_deal_id(game.deal_id).deal == game.deal
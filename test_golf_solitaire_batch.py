@@ -0,0 +1,31 @@
+import pytest
+np = pytest.importorskip("numpy")
+from golf_solitaire import CardDeck
+from golf_solitaire_batch import LOSE, WIN, BatchGolf, play_batch, shuffled_decks
+from golf_solitaire_sim import greedy_policy, play_deal
+
+def test_shuffled_decks_match_card_deck_shuffle():
+    # 32-bit seeds take the NumPy generator, the others are shuffled one by one
+    seeds = [*range(3000), 2**32 - 1, 2**32, 2**40 + 7, -1, -12345]
+    decks = shuffled_decks(seeds)
+    for seed, deck in zip(seeds, decks):
+        cards = CardDeck()
+        cards.shuffle(seed)
+        assert bytes(deck) == bytes(card.index for card in cards.cards), seed
+
+def test_greedy_batch_matches_scalar_games():
+    seeds = range(500)
+    batch = play_batch(BatchGolf.from_seeds(seeds), "greedy")
+    for seed in seeds:
+        _seed, won, moves, cards_left = play_deal(seed, greedy_policy)
+        assert batch.status[seed] == (WIN if won else LOSE), seed
+        assert batch.moves[seed] == moves, seed
+        assert batch.cards_left[seed] == cards_left, seed
+
+def test_step_rejects_wrong_number_of_actions():
+    batch = BatchGolf.from_seeds(range(10))
+    actions = np.full(batch.running() - 1, 7)
+    with pytest.raises(ValueError):
+        batch.step(actions)
+    with pytest.raises(ValueError):
+        batch.step(np.full((batch.running(), 1), 7))
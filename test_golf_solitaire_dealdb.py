@@ -0,0 +1,52 @@
+import random
+import pytest
+from golf_solitaire import CARD_COUNT
+from golf_solitaire_dealdb import (DIFFICULTY_UNKNOWN, DIFFICULTY_UNSOLVABLE, ENTRY, SOLVABLE, UNKNOWN, UNSOLVABLE,
+    DealDatabase, build, write)
+
+def entries_with(db: DealDatabase, low: int, high: int, min_moves_known: bool = False) -> list[int]:
+    """The band by looking at every entry"""
+    return [
+        position for position in range(len(db))
+        if low <= db[position].difficulty < high and (db[position].min_moves is not None or not min_moves_known)
+    ]
+
+def test_bands_match_a_scan_of_every_entry(tmp_path):
+    rng = random.Random(5)
+    entries = []
+    for seed in range(300):
+        # Few distinct difficulties, so runs of equal ones cross the index blocks
+        status = rng.choice([SOLVABLE] * 4 + [UNSOLVABLE, UNKNOWN])
+        difficulty = {SOLVABLE: rng.randrange(20), UNSOLVABLE: DIFFICULTY_UNSOLVABLE, UNKNOWN: DIFFICULTY_UNKNOWN}[status]
+        min_moves = rng.choice([0, rng.randrange(35, 60)]) if status == SOLVABLE else 0
+        entries.append(ENTRY.pack(difficulty, seed, status, min_moves, difficulty % 7, bytes(range(CARD_COUNT))))
+    path = str(tmp_path / "deals.db")
+    for stride in (1, 4, 1024):
+        write(path, entries, stride)
+        with DealDatabase(path) as db:
+            assert len(db) == 300
+            difficulties = [db[position].difficulty for position in range(len(db))]
+            assert difficulties == sorted(difficulties)
+            for difficulty in list(range(-1, 22)) + [DIFFICULTY_UNKNOWN, DIFFICULTY_UNSOLVABLE, DIFFICULTY_UNSOLVABLE + 1]:
+                assert db.lower_bound(difficulty) == len([d for d in difficulties if d < difficulty]), (stride, difficulty)
+            for low, high in [(0, 1), (3, 9), (5, 5), (9, 3), (19, 20), (0, DIFFICULTY_UNKNOWN), (0, DIFFICULTY_UNSOLVABLE + 1)]:
+                for min_moves_known in (False, True):
+                    assert list(db.band(low, high, min_moves_known)) == entries_with(db, low, high, min_moves_known)
+            band = entries_with(db, 3, 9, min_moves_known=True)
+            assert db.pick(3, 9, 7, min_moves_known=True).seed == db[band[7 % len(band)]].seed
+            with pytest.raises(LookupError):
+                db.pick(5, 5, 0)
+
+def test_built_database_holds_every_seed(tmp_path):
+    path = str(tmp_path / "deals.db")
+    # Too few nodes to find the shortest wins, so every deal's fewest moves are unknown
+    solvable = build(path, 0, 40, max_nodes=10_000, workers=1, chunk_size=10)
+    with DealDatabase(path) as db:
+        entries = list(db.entries(0, DIFFICULTY_UNSOLVABLE + 1))
+        assert sorted(entry.seed for entry in entries) == list(range(40))
+        assert sum(entry.solvable is True for entry in entries) == solvable
+        assert all(entry.min_moves is None for entry in entries)
+        assert not db.band(0, DIFFICULTY_UNSOLVABLE + 1, min_moves_known=True)
+        assert list(db.band(0, DIFFICULTY_UNKNOWN)) == entries_with(db, 0, DIFFICULTY_UNKNOWN)
+        assert all(entry.solvable for entry in db.entries(0, DIFFICULTY_UNKNOWN))
+        assert all(db[position].game().deal == db[position].deal for position in range(len(db)))
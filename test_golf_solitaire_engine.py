@@ -0,0 +1,42 @@
+import random
+from golf_solitaire import STOCK, TABLEAU_COLUMNS, GolfGame
+from golf_solitaire_engine import GolfState
+
+SEEDS = range(200)
+
+def same_position(state: GolfState, game: GolfGame) -> bool:
+    return repr(state) == repr(GolfState.from_game(game)) and state.moves == game.moves
+
+def test_from_seed_deals_like_golf_game():
+    for seed in SEEDS:
+        assert same_position(GolfState.from_seed(seed), GolfGame(seed=seed)), seed
+
+def test_rules_match_golf_game():
+    for seed in SEEDS:
+        game = GolfGame(seed=seed)
+        state = GolfState.from_seed(seed)
+        rng = random.Random(seed)
+        while True:
+            assert state.check_game_state() == game.check_game_state(), seed
+            assert state.legal_moves() == [move.source for move in game.legal_moves()], seed
+            if game.check_game_state() != "running":
+                break
+            # Tries every column the player could pick, legal or not, with the same messages
+            col = rng.randrange(TABLEAU_COLUMNS + 1)
+            if col == STOCK:
+                assert state.draw_from_wastepile() == game.draw_from_wastepile(), seed
+            else:
+                assert state.try_draw_card(col) == game.try_draw_card(col), seed
+            assert same_position(state, game), seed
+
+def test_revert_takes_back_apply():
+    for seed in SEEDS:
+        state = GolfState.from_seed(seed)
+        rng = random.Random(seed)
+        while state.check_game_state() == "running":
+            before = (repr(state), state.moves, state.key())
+            for move in state.legal_moves():
+                state.apply(move)
+                state.revert(move)
+                assert (repr(state), state.moves, state.key()) == before, seed
+            state.apply(rng.choice(state.legal_moves()))
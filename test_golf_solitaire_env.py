@@ -0,0 +1,23 @@
+import pytest
+np = pytest.importorskip("numpy")
+from golf_solitaire_env import ACTION_COUNT, GolfVectorEnv
+
+def test_workers_give_the_same_results_as_one_process():
+    rng = np.random.default_rng(7)
+    with GolfVectorEnv(10, workers=0) as local, GolfVectorEnv(10, workers=3) as pooled:
+        for env in (local, pooled):
+            env.reset(seed=100)
+        assert np.array_equal(local.observations, pooled.observations)
+        assert np.array_equal(local.action_masks, pooled.action_masks)
+        ended = 0
+        # Long enough for every environment to finish and start games of later seeds
+        for step in range(400):
+            actions = (rng.random((10, ACTION_COUNT)) * local.action_masks).argmax(axis=1)
+            for env in (local, pooled):
+                env.step(actions)
+            assert np.array_equal(local.observations, pooled.observations), step
+            assert np.array_equal(local.action_masks, pooled.action_masks), step
+            assert np.array_equal(local.rewards, pooled.rewards), step
+            assert np.array_equal(local.terminated, pooled.terminated), step
+            ended += int(local.terminated.sum())
+        assert ended > 20
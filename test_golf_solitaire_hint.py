@@ -0,0 +1,37 @@
+import time
+from golf_solitaire import GolfGame
+from golf_solitaire_hint import BUDGET, HintEngine
+
+TOLERANCE = 0.025 # Seconds a hint may run over its budget, for one last round of playouts and a busy machine
+
+def hint_times(engine: HintEngine, seed: int, budget: float) -> list[float]:
+    """Seconds each hint took while playing a game through on the hints"""
+    times = []
+    game = GolfGame(seed=seed)
+    while game.check_game_state() == "running":
+        start = time.perf_counter()
+        hint = engine.suggest(game, budget)
+        times.append(time.perf_counter() - start)
+        assert hint.move in game.legal_moves()
+        game.apply(hint.move)
+    return times
+
+def test_hints_in_this_process_keep_to_the_budget():
+    with HintEngine(workers=1, seed=1) as engine:
+        assert max(hint_times(engine, 1, BUDGET)) < BUDGET + TOLERANCE
+        assert engine.pool is None
+
+def test_hints_keep_to_the_budget_while_workers_start():
+    with HintEngine(workers=2, seed=2) as engine:
+        # The first hint starts the workers in the background and doesn't wait for them
+        assert max(hint_times(engine, 2, BUDGET)) < BUDGET + TOLERANCE
+        engine.starter.join()
+        assert engine.pool is not None
+        assert max(hint_times(engine, 3, BUDGET)) < BUDGET + TOLERANCE
+
+def test_spent_budget_gives_the_first_legal_move():
+    with HintEngine(workers=1, seed=3) as engine:
+        game = GolfGame(seed=4)
+        hint = engine.suggest(game, 0.0)
+        assert hint.move == game.legal_moves()[0]
+        assert hint.playouts == 0
@@ -0,0 +1,45 @@
+import threading
+from golf_solitaire import GolfGame
+from golf_solitaire_metrics import INSTRUMENTED, RECORDED, Metrics
+
+def test_every_operation_is_listed_once_enabled():
+    metrics = Metrics()
+    metrics.enable()
+    try:
+        operations = metrics.snapshot()["operations"]
+    finally:
+        metrics.disable()
+    assert sorted(operations) == sorted([name for _cls, _method, name in INSTRUMENTED] + RECORDED)
+    assert all(stats["calls"] == 0 for stats in operations.values())
+
+def test_counts_from_several_threads_while_exporting():
+    metrics = Metrics()
+    applied = [0] * 4
+    done = threading.Event()
+    def play(thread: int):
+        for seed in range(thread * 50, thread * 50 + 50):
+            game = GolfGame(seed=seed)
+            while game.check_game_state() == "running":
+                game.apply(game.legal_moves()[0])
+                applied[thread] += 1
+            metrics.record("frame", 0.001)
+    def export():
+        while not done.is_set():
+            metrics.snapshot()
+            metrics.to_prometheus()
+    metrics.enable()
+    try:
+        exporter = threading.Thread(target=export)
+        exporter.start()
+        players = [threading.Thread(target=play, args=(thread,)) for thread in range(4)]
+        for player in players:
+            player.start()
+        for player in players:
+            player.join()
+        done.set()
+        exporter.join()
+        operations = metrics.snapshot()["operations"]
+    finally:
+        metrics.disable()
+    assert operations["apply"]["calls"] == sum(applied)
+    assert operations["frame"]["calls"] == 200
@@ -0,0 +1,69 @@
+import random
+import struct
+import pytest
+from golf_solitaire import SHUFFLE_VERSION, GolfGame
+from golf_solitaire_record import KIND_SEED, RECORD_MAGIC_V1, GameRecord, RecordWriter, read_records
+
+def write_games(path: str) -> bytes:
+    with RecordWriter(str(path)) as writer:
+        for seed in range(3):
+            game = GolfGame(seed=seed)
+            rng = random.Random(seed)
+            for _ in range(10):
+                game.apply(rng.choice(game.legal_moves()))
+            writer.write_game(game)
+        writer.write_game(GolfGame(deck=GolfGame(seed=5).deal))
+    return path.read_bytes()
+
+def test_records_round_trip(tmp_path):
+    path = tmp_path / "games.bin"
+    write_games(path)
+    records = list(read_records(str(path)))
+    assert [record.seed for record in records] == [0, 1, 2, None]
+    for seed, record in zip(range(3), records):
+        game = GolfGame(seed=seed)
+        rng = random.Random(seed)
+        for _ in range(10):
+            game.apply(rng.choice(game.legal_moves()))
+        assert record.game().position_hash == game.position_hash
+
+def test_truncated_file_raises_value_error(tmp_path):
+    data = write_games(tmp_path / "games.bin")
+    ends = {4} # Just the magic is an empty file
+    position = 4
+    for record in read_records(str(tmp_path / "games.bin")):
+        position += len(record.encode())
+        ends.add(position)
+    cut = tmp_path / "cut.bin"
+    for size in range(4, len(data)):
+        cut.write_bytes(data[:size])
+        if size in ends:
+            list(read_records(str(cut)))
+        else:
+            with pytest.raises(ValueError, match="cut.bin"):
+                list(read_records(str(cut)))
+
+def test_seed_records_keep_the_shuffle_version(tmp_path):
+    path = tmp_path / "games.bin"
+    write_games(path)
+    records = list(read_records(str(path)))
+    assert [record.shuffle for record in records[:3]] == [SHUFFLE_VERSION] * 3
+    record = GameRecord(b"", seed=1, shuffle=SHUFFLE_VERSION + 1)
+    with RecordWriter(str(path)) as writer:
+        writer.write(record)
+    newer = list(read_records(str(path)))[-1]
+    assert newer.shuffle == SHUFFLE_VERSION + 1
+    with pytest.raises(ValueError, match="shuffle version"):
+        newer.game()
+
+def test_version_1_files_are_read(tmp_path):
+    game = GolfGame(seed=9)
+    game.apply(game.legal_moves()[-1])
+    path = tmp_path / "old.bin"
+    # Before the version byte: kind, seed, move count, moves
+    path.write_bytes(RECORD_MAGIC_V1 + bytes((KIND_SEED,)) + struct.pack("<Q", 9) + bytes((1, game.legal_moves()[-1].source if False else 7)))
+    record, = read_records(str(path))
+    assert record.seed == 9 and record.shuffle == 1
+    assert record.game().position_hash == game.position_hash
+    with pytest.raises(ValueError):
+        RecordWriter(str(path))
@@ -0,0 +1,48 @@
+import random
+import pytest
+from golf_solitaire import STOCK, GolfGame
+from golf_solitaire_engine import GolfState
+from golf_solitaire_replay import Replay
+
+def played_game(seed: int) -> tuple[GolfGame, bytes, list[tuple]]:
+    """A random game to its end, its moves, and every position along the way as played"""
+    game = GolfGame(seed=seed)
+    rng = random.Random(seed)
+    positions = [(repr(GolfState.from_game(game)), game.moves, game.position_hash)]
+    while game.check_game_state() == "running":
+        game.apply(rng.choice(game.legal_moves()))
+        positions.append((repr(GolfState.from_game(game)), game.moves, game.position_hash))
+    moves = bytes(source for source, _card, _moves in game.movestack.done)
+    return game, moves, positions
+
+def test_state_at_matches_playing_straight_through():
+    for seed in range(30):
+        game, moves, positions = played_game(seed)
+        # Intervals that put checkpoints on every move, some moves, and only the deal
+        for interval in (1, 3, 16, 1000):
+            replay = Replay(game.deal, moves, interval)
+            assert len(replay) == len(moves)
+            for move, (state, count, _hash) in enumerate(positions):
+                at = replay.state_at(move)
+                assert (repr(at), at.moves) == (state, count), (seed, interval, move)
+
+def test_positions_and_game_at_match_playing_straight_through():
+    for seed in range(10):
+        game, moves, positions = played_game(seed)
+        replay = Replay(game.deal, moves)
+        assert [(repr(state), state.moves) for state in replay.positions(5)] == [(state, count) for state, count, _hash in positions[5:]]
+        for move, (_state, count, position_hash) in enumerate(positions):
+            at = replay.game_at(move)
+            assert (at.moves, at.position_hash) == (count, position_hash), (seed, move)
+        # The moves are in the undo history
+        at = replay.game_at(len(moves))
+        at.undo()
+        assert at.position_hash == positions[-2][2]
+
+def test_illegal_moves_and_positions_are_rejected():
+    game = GolfGame(seed=0)
+    with pytest.raises(ValueError):
+        Replay(game.deal, bytes([STOCK] * 16))
+    replay = Replay(game.deal, bytes([STOCK] * 3))
+    with pytest.raises(IndexError):
+        replay.state_at(4)
@@ -0,0 +1,88 @@
+import random
+from golf_solitaire import STOCK, GolfGame
+from golf_solitaire_engine import GolfState
+from golf_solitaire_solver import Solver
+
+MAX_NODES = 100_000
+
+def small_position(seed: int) -> GolfState:
+    """A seeded deal cut down to a few cards per column and a short stock, small enough to search without a table"""
+    rng = random.Random(seed)
+    state = GolfState.from_seed(seed)
+    for col in range(len(state.heights)):
+        state.heights[col] = rng.randrange(3)
+    state.stock_size = rng.randrange(3, 9)
+    return state
+
+def fewest_moves(state: GolfState) -> int|None:
+    """Moves of the shortest win by trying every line, None if there is none"""
+    if state.check_game_state() == "win":
+        return 0
+    best = None
+    for move in state.legal_moves():
+        state.apply(move)
+        moves = fewest_moves(state)
+        state.revert(move)
+        if moves is not None and (best is None or moves + 1 < best):
+            best = moves + 1
+    return best
+
+def test_winning_lines_replay_as_wins():
+    solver = Solver(MAX_NODES)
+    wins = 0
+    for seed in range(30):
+        result = solver.solve(GolfState.from_seed(seed))
+        if not result.winnable:
+            assert result.line == []
+            continue
+        wins += 1
+        game = GolfGame(seed=seed)
+        for move in result.line:
+            game.apply(next(legal for legal in game.legal_moves() if legal.source == move))
+        assert game.check_game_state() == "win", seed
+    assert wins > 0
+
+def test_shortest_lines_are_shortest():
+    solver = Solver()
+    for seed in range(200):
+        state = small_position(seed)
+        best = fewest_moves(state.copy())
+        result = solver.solve(state, shortest=True)
+        assert result.winnable == (best is not None), seed
+        if best is not None:
+            assert len(result.line) == best, seed
+            for move in result.line:
+                assert move in state.legal_moves()
+                state.apply(move)
+            assert state.check_game_state() == "win", seed
+
+def test_lost_table_only_holds_lost_positions():
+    solver = Solver()
+    checked = 0
+    for seed in range(100):
+        state = small_position(seed)
+        solver.solve(state)
+        # A key is the packed column heights and the rank of the waste top, any card of that rank will do
+        for key, stock_size in list(solver.lost.items()):
+            rank, heights_key = key & 0xF, key >> 4
+            lost = state.copy()
+            for col in range(len(lost.heights) - 1, -1, -1):
+                lost.heights[col] = heights_key & 7
+                heights_key >>= 3
+            lost.stock_size = stock_size
+            lost.waste[lost.waste_size - 1] = rank
+            assert fewest_moves(lost) is None, (seed, key)
+            checked += 1
+    assert checked > 0
+
+def test_node_limit_gives_unknown():
+    result = Solver(max_nodes=10).solve(GolfState.from_seed(71))
+    assert result.winnable is None and result.line == []
+    assert Solver(max_nodes=10).solve(GolfState.from_seed(71), shortest=True).winnable is None
+
+def test_solve_leaves_the_state_alone():
+    state = GolfState.from_seed(3)
+    before = repr(state)
+    Solver(MAX_NODES).solve(state, shortest=True)
+    assert repr(state) == before
+    assert STOCK in state.legal_moves()
@@ -0,0 +1,102 @@
+import os
+import random
+from golf_solitaire_store import DEAL, JOURNAL_SUFFIX, JournaledGame, SessionStore
+
+def position(game: JournaledGame) -> tuple:
+    """Everything a resumed game has to match, including what can be redone"""
+    return (
+        game.deal,
+        [bytes(pile.indices) for pile in game.tableau],
+        bytes(game.stockpile.indices),
+        bytes(game.wastepile.indices),
+        game.moves,
+        game.position_hash,
+        bytes(game.played),
+        bytes(game.redoable),
+        [source for source, _card, _moves in game.movestack.undone],
+    )
+
+def resume(store: SessionStore, session_id: str) -> tuple[SessionStore, object]:
+    """Open the directory again as if the process had crashed, the old store's files are only closed afterwards"""
+    resumed = SessionStore(store.directory, store.max_history, sync_interval=0.0)
+    store.close()
+    return resumed, resumed[session_id]
+
+def test_redo_survives_compaction(tmp_path):
+    store = SessionStore(str(tmp_path), sync_interval=0.0)
+    session = store.create("a", seed=1)
+    game = session.game
+    for _ in range(6):
+        game.apply(game.legal_moves()[-1])
+    game.undo()
+    game.undo()
+    session.journal.compact()
+    game.redo()
+    expected = position(game)
+    store, session = resume(store, "a")
+    assert position(session.game) == expected
+    session.game.redo()
+    assert session.game.moves == 6
+    store.close()
+
+def test_resume_after_crash_matches_the_live_game(tmp_path):
+    rng = random.Random(3)
+    for max_history in (None, 5):
+        directory = tmp_path / f"history-{max_history}"
+        store = SessionStore(str(directory), max_history, sync_interval=0.0)
+        session = store.create("a", seed=1)
+        for step in range(2000):
+            game = session.game
+            action = rng.random()
+            if game.check_game_state() != "running":
+                session.new_game()
+            elif action < 0.05:
+                store.compact()
+            elif action < 0.3:
+                game.undo()
+            elif action < 0.45:
+                game.redo()
+            else:
+                game.apply(rng.choice(game.legal_moves()))
+            if step % 37 == 0:
+                expected = position(session.game)
+                store, session = resume(store, "a")
+                assert not session.loaded
+                assert position(session.game) == expected, (max_history, step)
+                if max_history is not None:
+                    assert len(session.game.movestack.done) <= max_history
+        store.close()
+
+def test_torn_tail_is_cut_off(tmp_path):
+    store = SessionStore(str(tmp_path), sync_interval=0.0)
+    session = store.create("a", seed=2)
+    game = session.game
+    for _ in range(5):
+        game.apply(game.legal_moves()[-1])
+    expected = position(game)
+    size = os.path.getsize(session.journal.path)
+    store.close()
+    with open(session.journal.path, "ab") as f:
+        f.write(bytes((DEAL,)) + bytes(10))
+    store = SessionStore(str(tmp_path))
+    session = store["a"]
+    assert position(session.game) == expected
+    assert os.path.getsize(session.journal.path) == size
+    # Moves are appended where the torn record was
+    session.game.apply(session.game.legal_moves()[-1])
+    expected = position(session.game)
+    store.close()
+    assert position(SessionStore(str(tmp_path))["a"].game) == expected
+
+def test_sessions_are_loaded_when_first_used(tmp_path):
+    store = SessionStore(str(tmp_path))
+    for seed in range(3):
+        store.create(f"s{seed}", seed=seed)
+    store.close()
+    assert sorted(os.listdir(tmp_path)) == [f"s{seed}{JOURNAL_SUFFIX}" for seed in range(3)]
+    store = SessionStore(str(tmp_path))
+    assert len(store) == 3
+    assert not any(session.loaded for session in store.sessions.values())
+    assert store["s1"].game.deal == JournaledGame(seed=1).deal
+    assert [session.loaded for session in store.sessions.values()].count(True) == 1
+    store.close()
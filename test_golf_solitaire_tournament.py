@@ -0,0 +1,33 @@
+import pytest
+from golf_solitaire_tournament import Standings, critical_z
+
+def standings(wins_a: list[int], wins_b: list[int]) -> Standings:
+    """Two policies that won the seeds marked 1"""
+    result = Standings(["a", "b"])
+    result.add([bytes(wins_a), bytes(wins_b)])
+    return result
+
+def test_win_rate_is_the_wilson_interval():
+    result = standings([1] * 8 + [0] * 2, [0] * 10)
+    # Wilson score intervals at 95% for 8 and 0 wins of 10
+    assert result.win_rate(0) == pytest.approx((0.8, 0.4902, 0.9433), abs=1e-4)
+    assert result.win_rate(1) == pytest.approx((0.0, 0.0, 0.2775), abs=1e-4)
+    assert Standings(["a", "b"]).win_rate(0) == (0.0, 0.0, 1.0)
+
+def test_z_score_counts_only_the_seeds_one_policy_won():
+    # 15 seeds only a won, 5 only b won, 30 both won and 50 neither
+    result = standings([1] * 15 + [0] * 5 + [1] * 30 + [0] * 50, [0] * 15 + [1] * 5 + [1] * 30 + [0] * 50)
+    assert result.beat == [[0, 15], [5, 0]]
+    assert result.z_score(0, 1) == pytest.approx(10 / 20 ** 0.5)
+    assert result.z_score(1, 0) == pytest.approx(-10 / 20 ** 0.5)
+    diff, low, high = result.difference(0, 1)
+    assert diff == pytest.approx(0.1)
+    assert (low, high) == pytest.approx((0.1 - 1.959964 * 19 ** 0.5 / 100, 0.1 + 1.959964 * 19 ** 0.5 / 100))
+    assert standings([1, 0, 1], [1, 0, 1]).z_score(0, 1) == 0.0
+
+def test_critical_z_splits_alpha_over_every_look():
+    assert critical_z(0.05, 1, 1) == pytest.approx(1.959964, abs=1e-6)
+    assert critical_z(0.01, 1, 1) == pytest.approx(2.575829, abs=1e-6)
+    # 0.05 / (2 * 10 looks * 2 comparisons) in the upper tail
+    assert critical_z(0.05, 10, 2) == pytest.approx(3.023341, abs=1e-6)
+    assert critical_z(0.05, 1, 0) == critical_z(0.05, 1, 1)